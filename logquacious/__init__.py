@@ -5,7 +5,27 @@ __author__ = 'Tony S Yu'
 __email__ = 'tsyu80@gmail.com'
 __version__ = '0.5.0'
 
+from .executors import ContextExecutor
+from .handlers import CoalescingHandler, FlightRecorderHandler
+from .instrumentation import instrument
 from .log_manager import LogManager
+from .multiprocess import ProcessLogAggregator
+from .nonblocking import configure_nonblocking
+from .switches import disable_functions, enable_functions
+from .tracing import set_trace_labels
+from .watchdog import ContextWatchdog
 
 
-__all__ = ['LogManager']
+__all__ = [
+    'CoalescingHandler',
+    'ContextExecutor',
+    'ContextWatchdog',
+    'FlightRecorderHandler',
+    'LogManager',
+    'ProcessLogAggregator',
+    'configure_nonblocking',
+    'disable_functions',
+    'enable_functions',
+    'instrument',
+    'set_trace_labels',
+]
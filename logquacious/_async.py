@@ -0,0 +1,52 @@
+"""
+Decorator wrappers for coroutine and generator functions.
+
+This module uses `async` and `yield from` syntax, so it's only imported on
+Python >= 3.5.
+"""
+import functools
+
+
+def wrap_coroutine_function(context_logger, func):
+    """Return coroutine function logging awaited calls of `func`.
+
+    Arguments:
+        context_logger: `FunctionContextLogger` decorating `func`.
+        func: Coroutine function.
+    """
+    @functools.wraps(func)
+    async def decorated_func(*args, **kwargs):
+        if not (context_logger.enabled and context_logger.is_logged()):
+            return await func(*args, **kwargs)
+        invocation = context_logger.start_invocation(args, kwargs)
+        try:
+            if invocation.start_msg:
+                context_logger.log(invocation.start_msg,
+                                   **invocation.log_kwargs)
+            with context_logger.call_context():
+                output = await func(*args, **kwargs)
+            finish_msg = context_logger.finish_message(invocation, args,
+                                                       kwargs)
+            if finish_msg:
+                context_logger.log(finish_msg, **invocation.log_kwargs)
+        finally:
+            context_logger.end_invocation(invocation)
+        return output
+
+    return decorated_func
+
+
+def delegate_generator(context_logger, func, args, kwargs):
+    """Return generator logging iteration of `func`, and its return value.
+
+    Arguments:
+        context_logger: `FunctionContextLogger` decorating `func`.
+        func: Generator function.
+        args: Positional arguments of `func`.
+        kwargs: Keyword arguments of `func`.
+    """
+    result = [None]
+    # Records are logged one frame deeper, below this generator.
+    yield from context_logger._generate(func, args, kwargs, result,
+                                        stacklevel=4)
+    return result[0]
@@ -1,12 +1,25 @@
 import functools
 import sys
+import threading
+import time
+import weakref
 
 if (sys.version_info > (3, 0)):
+    import queue
     from collections.abc import Mapping
     from contextlib import ContextDecorator
+    from io import StringIO
+    from time import perf_counter
 else:
+    import Queue as queue
     from collections import Mapping
 
+    # `io.StringIO` only accepts unicode, which `pstats` doesn't write.
+    import StringIO as _StringIO
+    StringIO = _StringIO.StringIO
+
+    perf_counter = time.time
+
     class ContextDecorator(object):
         def __call__(self, f):
             @functools.wraps(f)
@@ -16,7 +29,134 @@ else:
             return decorated
 
 
+try:
+    from concurrent.futures import Executor
+except ImportError:  # Python 2 without the `futures` backport
+    class Executor(object):
+        """Minimal replacement for `concurrent.futures.Executor`."""
+
+        def submit(self, func, *args, **kwargs):
+            raise NotImplementedError()
+
+        def map(self, func, *iterables, **kwargs):
+            futures = [self.submit(func, *args) for args in zip(*iterables)]
+            return (future.result() for future in futures)
+
+        def shutdown(self, wait=True):
+            pass
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, exc_type, exc_val, exc_tb):
+            self.shutdown(wait=True)
+            return False
+
+
+try:
+    from types import MappingProxyType
+except ImportError:  # Python 2
+    MappingProxyType = dict
+
+
+if hasattr(time, 'perf_counter_ns'):
+    from time import perf_counter_ns
+else:  # Python < 3.7
+    def perf_counter_ns():
+        return int(perf_counter() * 1e9)
+
+
+if hasattr(time, 'thread_time'):
+    from time import thread_time
+elif hasattr(time, 'process_time'):  # Python < 3.7
+    from time import process_time as thread_time
+else:  # Python 2
+    thread_time = time.clock
+
+
+try:
+    from contextvars import ContextVar, copy_context
+except ImportError:  # Python < 3.7
+    # Weakly referenced, so discarded variables, e.g. of depth limits, can be
+    # garbage collected.
+    _context_vars = weakref.WeakSet()
+
+    class _Token(object):
+        def __init__(self, old_value):
+            self.old_value = old_value
+
+    class ContextVar(object):
+        """Minimal thread-local replacement for `contextvars.ContextVar`."""
+
+        _missing = object()
+
+        def __init__(self, name, default=_missing):
+            self.name = name
+            self._default = default
+            self._local = threading.local()
+            _context_vars.add(self)
+
+        def get(self, *default):
+            value = getattr(self._local, 'value', self._missing)
+            if value is not self._missing:
+                return value
+            if default:
+                return default[0]
+            if self._default is not self._missing:
+                return self._default
+            raise LookupError(self.name)
+
+        def set(self, value):
+            token = _Token(getattr(self._local, 'value', self._missing))
+            self._local.value = value
+            return token
+
+        def reset(self, token):
+            self._local.value = token.old_value
+
+    class _Context(object):
+        """Minimal replacement for `contextvars.Context`."""
+
+        def __init__(self, values):
+            self._values = values
+
+        def run(self, func, *args, **kwargs):
+            tokens = [(var, var.set(value))
+                      for var, value in self._values.items()]
+            try:
+                return func(*args, **kwargs)
+            finally:
+                for var, token in reversed(tokens):
+                    var.reset(token)
+
+    def copy_context():
+        """Minimal replacement for `contextvars.copy_context`."""
+        return _Context({
+            var: var.get(ContextVar._missing) for var in _context_vars
+        })
+
+try:
+    from inspect import iscoroutinefunction
+    from ._async import delegate_generator, wrap_coroutine_function
+except (ImportError, SyntaxError):  # Python < 3.5
+    def iscoroutinefunction(func):
+        return False
+
+    delegate_generator = None
+    wrap_coroutine_function = None
+
 __all__ = [
     'ContextDecorator',
+    'ContextVar',
+    'copy_context',
+    'delegate_generator',
+    'Executor',
+    'iscoroutinefunction',
     'Mapping',
+    'MappingProxyType',
+    'perf_counter',
+    'perf_counter_ns',
+    'queue',
+    'thread_time',
+    'wrap_coroutine_function',
 ]
@@ -0,0 +1,132 @@
+"""
+Tail-based buffering of low-level records.
+
+A `RecordBuffer` holds back DEBUG records emitted inside a context and only
+passes them on to handlers if the context fails. Records are intercepted by
+`BufferingFilter`, which is added to the handlers of the buffered logger while
+buffers are open.
+"""
+import logging
+import threading
+from collections import deque
+
+from . import utils
+from ._compat import ContextVar
+
+
+__all__ = ['BufferingFilter', 'RecordBuffer']
+
+
+#: Maximum number of records held by a `RecordBuffer`. Oldest records are
+#: dropped first.
+MAX_BUFFERED_RECORDS = 1000
+
+#: Record attribute pointing to the buffer that holds the record.
+_BUFFER_ATTRIBUTE = '_logquacious_buffer'
+
+_active_buffer = ContextVar('logquacious_active_buffer', default=None)
+
+
+class BufferingFilter(logging.Filter):
+    """Handler filter diverting records to the active `RecordBuffer`.
+
+    Records pass through unchanged when no buffer is active.
+    """
+
+    def filter(self, record):
+        record_buffer = _active_buffer.get()
+        if record_buffer is None or record.levelno > record_buffer.level:
+            return True
+        records = record_buffer.records
+        if records is None:
+            # Buffer already exited, but is still active in a context copied
+            # before it exited, e.g. by an asyncio task or `ContextExecutor`.
+            return True
+        # The same record is seen by every handler, but only buffered once.
+        if getattr(record, _BUFFER_ATTRIBUTE, None) is not record_buffer:
+            setattr(record, _BUFFER_ATTRIBUTE, record_buffer)
+            records.append(record)
+        return False
+
+
+#: Filter shared by all handlers used with `RecordBuffer`.
+BUFFERING_FILTER = BufferingFilter()
+
+# Number of open buffers using each handler. The filter is removed from
+# handlers when the last buffer using them exits.
+_handler_users = {}
+_handler_users_lock = threading.Lock()
+
+
+def _add_buffering_filter(handlers):
+    with _handler_users_lock:
+        for handler in handlers:
+            users = _handler_users.get(handler, 0)
+            if not users:
+                handler.addFilter(BUFFERING_FILTER)
+            _handler_users[handler] = users + 1
+
+
+def _remove_buffering_filter(handlers):
+    with _handler_users_lock:
+        for handler in handlers:
+            users = _handler_users.pop(handler) - 1
+            if users:
+                _handler_users[handler] = users
+            else:
+                handler.removeFilter(BUFFERING_FILTER)
+
+
+class RecordBuffer(object):
+    """Context manager that only emits low-level records if the context fails.
+
+    Records at or below `level` are held in a bounded buffer while the context
+    is open. They're dropped if the context exits normally and passed to
+    handlers if it exits with an exception. Nested buffers defer to the
+    outermost buffer.
+
+    Arguments:
+        logger: Logger or logger name whose handlers are buffered. Records from
+            child loggers that reach the same handlers are buffered, as well.
+        level: Records at or below this level are buffered.
+        capacity: Maximum number of buffered records.
+    """
+
+    def __init__(self, logger, level=logging.DEBUG,
+                 capacity=MAX_BUFFERED_RECORDS):
+        self.logger = utils.get_logger(logger)
+        self.level = level
+        self.capacity = capacity
+        self.records = None
+        self._token = None
+        self._handlers = ()
+
+    def __enter__(self):
+        if _active_buffer.get() is not None:
+            return self
+
+        self._handlers = tuple(utils.iter_handlers(self.logger))
+        _add_buffering_filter(self._handlers)
+        self.records = deque(maxlen=self.capacity)
+        self._token = _active_buffer.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self._token is None:
+            return
+        _active_buffer.reset(self._token)
+        self._token = None
+        _remove_buffering_filter(self._handlers)
+        self._handlers = ()
+
+        records, self.records = self.records, None
+        if exc_type is not None:
+            self.flush(records)
+
+    def flush(self, records):
+        """Pass records to the buffered handlers."""
+        handlers = list(utils.iter_handlers(self.logger))
+        for record in records:
+            for handler in handlers:
+                if record.levelno >= handler.level:
+                    handler.handle(record)
@@ -0,0 +1,44 @@
+"""
+Executors that carry logquacious context state into worker threads.
+
+Context state, such as the labels of open contexts (see
+`log_context.get_context_labels`) or active debug buffers, is stored in
+context variables. Work submitted to thread pools runs in the worker thread's
+context, so the helpers below capture the caller's context with
+`copy_context`, which doesn't depend on the amount of state, and run the work
+inside it.
+"""
+from ._compat import Executor, copy_context
+
+
+__all__ = ['ContextExecutor', 'run_in_executor', 'submit_with_context']
+
+
+def submit_with_context(executor, func, *args, **kwargs):
+    """Submit `func` to executor to run in the current context."""
+    return executor.submit(copy_context().run, func, *args, **kwargs)
+
+
+def run_in_executor(loop, executor, func, *args):
+    """Wrapper for `loop.run_in_executor` that runs in the current context."""
+    return loop.run_in_executor(executor, copy_context().run, func, *args)
+
+
+class ContextExecutor(Executor):
+    """Executor wrapper running submitted work in the submitter's context.
+
+    >>> from concurrent.futures import ThreadPoolExecutor
+    >>> with ContextExecutor(ThreadPoolExecutor(max_workers=2)) as executor:
+    ...     future = executor.submit(sum, [1, 2])
+    >>> future.result()
+    3
+    """
+
+    def __init__(self, executor):
+        self.executor = executor
+
+    def submit(self, func, *args, **kwargs):
+        return submit_with_context(self.executor, func, *args, **kwargs)
+
+    def shutdown(self, wait=True):
+        self.executor.shutdown(wait=wait)
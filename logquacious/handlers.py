@@ -0,0 +1,187 @@
+"""
+Logging handlers provided by logquacious.
+"""
+import logging
+import operator
+import signal
+
+from . import utils
+
+
+__all__ = ['CoalescingHandler', 'FlightRecorderHandler']
+
+
+#: Record attributes stored by `FlightRecorderHandler`. Records are stored as
+#: tuples of these values and only rebuilt into `LogRecord`s when dumped.
+RECORD_FIELDS = (
+    'name',
+    'msg',
+    'args',
+    'levelname',
+    'levelno',
+    'pathname',
+    'filename',
+    'module',
+    'exc_info',
+    'funcName',
+    'lineno',
+    'created',
+    'msecs',
+    'relativeCreated',
+    'thread',
+    'threadName',
+    'processName',
+    'process',
+)
+
+_get_record_fields = operator.attrgetter(*RECORD_FIELDS)
+
+#: Message of the record summarizing repeats coalesced by `CoalescingHandler`.
+REPEATED_MESSAGE = 'Last message repeated %d times'
+#: Record attribute with the number of coalesced repeats.
+REPEAT_COUNT_ATTRIBUTE = 'repeat_count'
+
+
+class FlightRecorderHandler(logging.Handler):
+    """Handler that keeps the last records in memory until they're dumped.
+
+    Records are stored in a preallocated ring buffer as tuples of raw record
+    attributes (see `RECORD_FIELDS`) and a dict of extra attributes, such as
+    fields bound with `LogManager.bind`. Nothing is formatted until records
+    are dumped to `target`, which happens when a record at or above
+    `flush_level` is handled or when `dump` is called, e.g. by
+    `LogManager.dump_flight_recorder` or a signal registered with
+    `dump_on_signal`.
+
+    Note that message arguments and extra attributes are stored by reference,
+    so mutable values are rendered with their value at the time of the dump.
+
+    Arguments:
+        target: Handler receiving dumped records.
+        capacity: Number of records kept in memory.
+        flush_level: Records at or above this level trigger a dump. If None,
+            records never trigger a dump.
+    """
+
+    def __init__(self, target, capacity=1000, flush_level=logging.ERROR,
+                 level=logging.NOTSET):
+        super(FlightRecorderHandler, self).__init__(level=level)
+        self.target = target
+        self.capacity = capacity
+        self.flush_level = flush_level
+        self._buffer = [None] * capacity
+        self._count = 0
+
+    def emit(self, record):
+        index = self._count % self.capacity
+        self._buffer[index] = (_get_record_fields(record),
+                               utils.get_extra_attributes(record))
+        self._count += 1
+        flush_level = self.flush_level
+        if flush_level is not None and record.levelno >= flush_level:
+            self.dump()
+
+    def dump(self):
+        """Pass buffered records to `target`, oldest first, and clear them."""
+        self.acquire()
+        try:
+            count = min(self._count, self.capacity)
+            start = self._count - count
+            values = [
+                self._buffer[i % self.capacity]
+                for i in range(start, self._count)
+            ]
+            self._buffer = [None] * self.capacity
+            self._count = 0
+        finally:
+            self.release()
+
+        for record_values, extra in values:
+            attributes = dict(zip(RECORD_FIELDS, record_values))
+            attributes.update(extra)
+            record = logging.makeLogRecord(attributes)
+            if record.levelno >= self.target.level:
+                self.target.handle(record)
+
+    def dump_on_signal(self, signum):
+        """Dump records when the process receives the given signal number."""
+        signal.signal(signum, lambda signum, frame: self.dump())
+
+
+class CoalescingHandler(logging.Handler):
+    """Handler that collapses identical consecutive records.
+
+    Records are identical if they share the logger name, level, message
+    template and arguments. Records are compared without formatting, and
+    records with exception info are never coalesced. The first record of a
+    run is passed to `target` right away, while repeats within `window`
+    seconds of it are only counted. When the run ends, a summary record
+    (see `REPEATED_MESSAGE`) is passed to `target`, with the count in its
+    `repeat_count` attribute.
+
+    A run ends when a different record is handled, when a repeat arrives after
+    the window, or when the handler is flushed or closed.
+
+    Arguments:
+        target: Handler receiving records.
+        window: Maximum time, in seconds, from the first record of a run to a
+            coalesced repeat.
+    """
+
+    def __init__(self, target, window=1.0, level=logging.NOTSET):
+        super(CoalescingHandler, self).__init__(level=level)
+        self.target = target
+        self.window = window
+        self._first = None
+        self._last_repeat = None
+        self._count = 0
+
+    def emit(self, record):
+        first = self._first
+        if (first is not None
+                and record.created - first.created <= self.window
+                and _is_repeat(first, record)):
+            self._last_repeat = record
+            self._count += 1
+            return
+
+        self._emit_summary()
+        self._first = None if record.exc_info else record
+        self._pass_to_target(record)
+
+    def flush(self):
+        """Pass the summary of pending repeats to `target` and flush it."""
+        self.acquire()
+        try:
+            self._emit_summary()
+            self._first = None
+        finally:
+            self.release()
+        self.target.flush()
+
+    def close(self):
+        self.flush()
+        super(CoalescingHandler, self).close()
+
+    def _emit_summary(self):
+        if not self._count:
+            return
+        attributes = dict(vars(self._last_repeat))
+        attributes.pop('message', None)
+        attributes.update(msg=REPEATED_MESSAGE, args=(self._count,))
+        attributes[REPEAT_COUNT_ATTRIBUTE] = self._count
+        self._last_repeat = None
+        self._count = 0
+        self._pass_to_target(logging.makeLogRecord(attributes))
+
+    def _pass_to_target(self, record):
+        if record.levelno >= self.target.level:
+            self.target.handle(record)
+
+
+def _is_repeat(first, record):
+    return (record.msg == first.msg
+            and record.args == first.args
+            and record.levelno == first.levelno
+            and record.name == first.name
+            and not record.exc_info)
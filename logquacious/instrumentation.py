@@ -0,0 +1,162 @@
+"""
+Import hook wrapping functions of matching modules with context logging.
+
+`instrument` installs a finder on `sys.meta_path`. Modules whose name matches
+the pattern are instrumented as they're imported, and matching modules that
+were already imported are instrumented right away. Functions and classes
+defined in an instrumented module are wrapped as if decorated with
+`log.context.<level>`, using the module's logger.
+
+Wrapped functions register with `logquacious.switches.FUNCTIONS`, so their
+logging can also be toggled with `enable_functions`/`disable_functions`.
+"""
+import fnmatch
+import inspect
+import logging
+import sys
+import threading
+
+from .context_templates import ContextTemplates
+from .log_context import _ContextLoggerFactory
+
+
+__all__ = ['Instrumentation', 'instrument']
+
+
+class Instrumentation(object):
+    """Instrumentation of modules matching a pattern.
+
+    Arguments:
+        pattern: Glob pattern matched against module names.
+        level: Log level, as a number or name.
+        templates: Context templates. See `LogManager`.
+        options: Keyword arguments for `log.context.<level>`, such as
+            `show_args` or `slow_threshold`.
+    """
+
+    def __init__(self, pattern, level=logging.DEBUG, templates=None,
+                 **options):
+        self.pattern = pattern
+        if not isinstance(level, int):
+            level = logging.getLevelName(level)
+        self.level = level
+        self.templates = ContextTemplates.resolve(templates)
+        self.options = options
+        self._finder = _InstrumentingFinder(self)
+        self._patched = []
+        self._decorators = []
+        self._lock = threading.Lock()
+
+    def matches(self, module_name):
+        return fnmatch.fnmatchcase(module_name, self.pattern)
+
+    def install(self):
+        """Install import hook and instrument matching imported modules."""
+        if self._finder in sys.meta_path:
+            return
+        sys.meta_path.insert(0, self._finder)
+        for name, module in list(sys.modules.items()):
+            if module is not None and self.matches(name):
+                self.instrument_module(module)
+
+    def remove(self):
+        """Remove import hook and restore original functions."""
+        if self._finder in sys.meta_path:
+            sys.meta_path.remove(self._finder)
+        with self._lock:
+            patched, self._patched = self._patched, []
+            decorators, self._decorators = self._decorators, []
+        for namespace, name, original in reversed(patched):
+            setattr(namespace, name, original)
+        # Wrapped functions may still be referenced, e.g. after
+        # `from module import function`.
+        for decorator in decorators:
+            decorator.enabled = False
+
+    def instrument_module(self, module):
+        """Wrap functions and classes defined in module."""
+        factory = _ContextLoggerFactory(module.__name__, self.level,
+                                        self.templates)
+        for name, attribute in list(vars(module).items()):
+            if getattr(attribute, '__module__', None) != module.__name__:
+                continue  # Imported from another module.
+            if inspect.isfunction(attribute):
+                decorator = factory(**self.options)
+                with self._lock:
+                    self._patched.append((module, name, attribute))
+                    self._decorators.append(decorator)
+                setattr(module, name, decorator(attribute))
+            elif inspect.isclass(attribute):
+                self._instrument_class(factory, attribute)
+
+    def _instrument_class(self, factory, cls):
+        original_attributes = dict(vars(cls))
+        factory(**self.options)(cls)
+        for name, original in original_attributes.items():
+            if vars(cls)[name] is not original:
+                with self._lock:
+                    self._patched.append((cls, name, original))
+
+    def __enter__(self):
+        self.install()
+        return self
+
+    def __exit__(self, *args):
+        self.remove()
+
+
+class _InstrumentingFinder(object):
+    """Meta path finder wrapping loaders of matching modules."""
+
+    def __init__(self, instrumentation):
+        self.instrumentation = instrumentation
+
+    def find_spec(self, fullname, path, target=None):
+        if not self.instrumentation.matches(fullname):
+            return None
+        meta_path = sys.meta_path
+        start = meta_path.index(self) + 1 if self in meta_path else 0
+        for finder in meta_path[start:]:
+            find_spec = getattr(finder, 'find_spec', None)
+            spec = None if find_spec is None else find_spec(fullname, path,
+                                                            target)
+            if spec is None:
+                continue
+            if hasattr(spec.loader, 'exec_module'):
+                spec.loader = _InstrumentingLoader(spec.loader,
+                                                   self.instrumentation)
+            return spec
+        return None
+
+
+class _InstrumentingLoader(object):
+    """Loader proxy instrumenting modules after executing them."""
+
+    def __init__(self, loader, instrumentation):
+        self.loader = loader
+        self.instrumentation = instrumentation
+
+    def create_module(self, spec):
+        return self.loader.create_module(spec)
+
+    def exec_module(self, module):
+        self.loader.exec_module(module)
+        self.instrumentation.instrument_module(module)
+
+    def __getattr__(self, name):
+        return getattr(self.loader, name)
+
+
+def instrument(pattern, level=logging.DEBUG, templates=None, **options):
+    """Instrument modules matching pattern as they're imported.
+
+    Requires Python 3. See `Instrumentation` for arguments.
+
+    Returns:
+        Installed `Instrumentation`. Call `remove` to restore the original
+        functions.
+    """
+    instrumentation = Instrumentation(pattern, level=level,
+                                      templates=templates, **options)
+    instrumentation.install()
+    return instrumentation
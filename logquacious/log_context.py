@@ -1,12 +1,95 @@
+import copy
+import fnmatch
 import functools
+import inspect
 import logging
-
-from . import utils
+import string
+import sys
+from collections import OrderedDict
+
+from . import overhead, utils
+from ._compat import (
+    ContextVar,
+    delegate_generator,
+    iscoroutinefunction,
+    perf_counter,
+    perf_counter_ns,
+    thread_time,
+    wrap_coroutine_function,
+)
+from .buffering import RecordBuffer
 from .context_templates import ContextTemplates
+from .memory import get_memory_tracker
+from .profiling import get_profiler
+from .sampling import SAMPLE_RATE_ATTRIBUTE, AdaptiveSampler
+from .switches import FUNCTIONS
+from .tracing import TRACE
+from .watchdog import REGISTRY
 from .backport_configurable_stacklevel import PatchedLoggerMixin
 
 
-__all__ = ['LogContext']
+__all__ = ['LogContext', 'get_context_labels']
+
+
+#: Labels of open contexts, stored as linked `(label, parent)` nodes so that
+#: entering a context doesn't copy the stack.
+_context_stack = ContextVar('logquacious_context_stack', default=None)
+
+#: Record attribute and template field with the wall time of a context.
+WALL_TIME_ATTRIBUTE = 'wall_time'
+#: Record attribute and template field with the CPU time of a context.
+CPU_TIME_ATTRIBUTE = 'cpu_time'
+#: Record attribute and template field with the number of generated items.
+ITEMS_ATTRIBUTE = 'items'
+#: Record attribute and template field with the time spent in a generator.
+ACTIVE_TIME_ATTRIBUTE = 'active_time'
+
+#: Maximum number of context manager labels with shared samplers and depth
+#: limits, per level. The least recently used labels are dropped first.
+MAX_SHARED_LABELS = 1000
+
+_formatter = string.Formatter()
+
+# Before Python 3.11, `findCaller` counts the `Logger.log` frame, which is
+# skipped when calling `Logger._log` directly.
+_DIRECT_LOG_STACKLEVEL_OFFSET = 1 if sys.version_info < (3, 11) else 0
+
+
+def get_context_labels():
+    """Return labels of open contexts, from outermost to innermost."""
+    labels = []
+    node = _context_stack.get()
+    while node is not None:
+        label, node = node
+        labels.append(label)
+    return tuple(reversed(labels))
+
+
+def _nesting_depth(limit):
+    """Return number of open contexts, counting at most `limit` of them."""
+    depth = 0
+    node = _context_stack.get()
+    while node is not None and depth < limit:
+        node = node[1]
+        depth += 1
+    return depth
+
+
+_template_fields_cache = {}
+
+
+def _template_fields(template):
+    """Return names of fields used in template."""
+    if not template:
+        return frozenset()
+    fields = _template_fields_cache.get(template)
+    if fields is None:
+        fields = _template_fields_cache[template] = frozenset(
+            field_name.split('.')[0].split('[')[0]
+            for _, field_name, _, _ in _formatter.parse(template)
+            if field_name
+        )
+    return fields
 
 
 class LogContext:
@@ -18,34 +101,140 @@ class LogContext:
         warning: Decorator/context-manager with level `logging.WARNING`.
         error: Decorator/context-manager with level `logging.ERROR`.
         fatal: Decorator/context-manager with level `logging.CRITICAL`.
+        overhead: `OverheadStats` for time spent in logquacious.
     """
 
     def __init__(self, logger, templates=None):
         templates = ContextTemplates.resolve(templates)
         self.logger = utils.get_logger(logger)
-        self.debug = _ContextLoggerFactory(logger, logging.DEBUG, templates)
-        self.info = _ContextLoggerFactory(logger, logging.INFO, templates)
-        self.warning = _ContextLoggerFactory(logger, logging.WARNING, templates)  # noqa: E501
-        self.error = _ContextLoggerFactory(logger, logging.ERROR, templates)
-        self.fatal = _ContextLoggerFactory(logger, logging.CRITICAL, templates)
+        self.overhead = overhead.OverheadStats()
+
+        def factory(log_level):
+            return _ContextLoggerFactory(logger, log_level, templates,
+                                         overhead_stats=self.overhead)
+
+        self.debug = factory(logging.DEBUG)
+        self.info = factory(logging.INFO)
+        self.warning = factory(logging.WARNING)
+        self.error = factory(logging.ERROR)
+        self.fatal = factory(logging.CRITICAL)
+
+    def bind(self, extra):
+        """Return copy whose records have `extra` attributes.
+
+        Templates, samplers and overhead stats are shared with this instance.
+        """
+        context = copy.copy(self)
+        for name in ('debug', 'info', 'warning', 'error', 'fatal'):
+            setattr(context, name, getattr(self, name).bind(extra))
+        return context
+
+
+class DepthLimit(object):
+    """Recursion depth of a label, tracked per thread or task.
+
+    Entries nested deeper than `max_depth` aren't logged. They're counted, and
+    the count is passed to the finish template of the deepest logged entry as
+    `nested_calls`.
+    """
+
+    def __init__(self, max_depth, name='label'):
+        if max_depth < 1:
+            msg = "max_depth must be at least 1, got {!r}"
+            raise ValueError(msg.format(max_depth))
+        self.max_depth = max_depth
+        self._state = ContextVar('logquacious_depth_{}'.format(name),
+                                 default=(0, None))
+
+    def enter(self):
+        """Enter nested entry and return `(token, nested_calls)`.
+
+        `nested_calls` is a one-item list counting nested entries that aren't
+        logged, or None if this entry isn't logged itself.
+        """
+        depth, nested_calls = self._state.get()
+        depth += 1
+        if depth > self.max_depth:
+            nested_calls[0] += 1
+            return self._state.set((depth, nested_calls)), None
+        nested_calls = [0]
+        return self._state.set((depth, nested_calls)), nested_calls
+
+    def exit(self, token):
+        self._state.reset(token)
+
+
+class _Invocation(object):
+    """State of a single entry of a context manager or decorated function.
+
+    Attributes:
+        log_kwargs: Keyword arguments for `_BaseContextLogger.log`, or None if
+            the invocation isn't logged.
+        fields: Template fields.
+        start_msg: Formatted start message, if any.
+    """
+
+    __slots__ = ('log_kwargs', 'fields', 'start_msg', 'start_time',
+                 'cpu_start_time', 'tracker_states', 'depth_token',
+                 'nested_calls')
+
+    def __init__(self):
+        self.log_kwargs = None
+        self.fields = None
+        self.start_msg = None
+        self.start_time = None
+        self.cpu_start_time = None
+        self.tracker_states = None
+        self.depth_token = None
+        self.nested_calls = None
 
 
 class _BaseContextLogger(PatchedLoggerMixin):
 
     context_type = None
 
-    def __init__(self, templates, logger, log_level=logging.INFO, label=None):
+    def __init__(self, templates, logger, log_level=logging.INFO, label=None,
+                 slow_threshold=None, buffer_debug=False, overhead_stats=None,
+                 sampler=None, depth_limit=None, max_nesting=None,
+                 timing=False, trackers=(), extra=None):
         super(_BaseContextLogger, self).__init__()
 
         self.logger = utils.get_logger(logger)
         self.log_level = log_level
         self.label = label
-
+        self.slow_threshold = slow_threshold
+        self.buffer_debug = buffer_debug
+        # Objects with `start(label)` and `stop(state)` methods, such as
+        # memory trackers and profilers. See `logquacious.memory`.
+        self.trackers = trackers
+        self.sampler = sampler
+        self.depth_limit = depth_limit
+        if max_nesting is not None and max_nesting < 1:
+            msg = "max_nesting must be at least 1, got {!r}"
+            raise ValueError(msg.format(max_nesting))
+        self.max_nesting = max_nesting
+        #: Mapping of record attributes added to all records.
+        self.extra = extra
+        if overhead_stats is None:
+            overhead_stats = overhead.OverheadStats()
+        self.overhead_stats = overhead_stats
+
+        start = perf_counter_ns() if overhead_stats.enabled else None
         level_name = logging.getLevelName(log_level)
         start_key = '{}.start.{}'.format(self.context_type, level_name)
         self.start_template = templates.get(start_key)
         finish_key = '{}.finish.{}'.format(self.context_type, level_name)
         self.finish_template = templates.get(finish_key)
+        self._template_lookup_time = (
+            None if start is None else perf_counter_ns() - start
+        )
+
+        # Timers only run if their values are used.
+        self.timing = timing
+        finish_fields = _template_fields(self.finish_template)
+        self._time_wall = (timing or slow_threshold is not None
+                           or WALL_TIME_ATTRIBUTE in finish_fields)
+        self._time_cpu = timing or CPU_TIME_ATTRIBUTE in finish_fields
 
     def log(self, msg, *args, **kwargs):
         # Stacklevel 3:
@@ -54,89 +243,712 @@ class _BaseContextLogger(PatchedLoggerMixin):
         #      or __enter__/__exit__ of `ContextLogger`.
         #   3: Function that was decorated or the original call of the context.
         kwargs.setdefault('stacklevel', 3)
+        if kwargs.pop('force', False):
+            # Traced label: Bypass the logger's level, but not handler levels.
+            kwargs['stacklevel'] -= _DIRECT_LOG_STACKLEVEL_OFFSET
+            with self.temp_monkey_patched_logger():
+                self.logger._log(self.log_level, msg, args, **kwargs)
+            return
+        if self.overhead_stats.enabled:
+            # `overhead.timed_log` adds a level to the stack.
+            kwargs['stacklevel'] += 1
+            creation, dispatch = overhead.timed_log(
+                self.logger, self.log_level, msg, args, kwargs,
+            )
+            self.overhead_stats.add(self.label, overhead.RECORD_CREATION,
+                                    creation)
+            self.overhead_stats.add(self.label, overhead.HANDLER_DISPATCH,
+                                    dispatch)
+            return
         with self.temp_monkey_patched_logger():
             self.logger.log(self.log_level, msg, *args, **kwargs)
 
+    def is_logged(self):
+        """Return False if the level is disabled and no labels are traced.
+
+        Contexts that aren't logged are skipped entirely: They aren't added to
+        `get_context_labels`, watchdogs or debug buffers.
+        """
+        # `isEnabledFor` results are cached by `logging` and invalidated when
+        # its configuration changes. Traced labels are checked on entry.
+        return bool(TRACE.labels) or self.logger.isEnabledFor(self.log_level)
+
+    def start_invocation(self, args=None, kwargs=None):
+        """Return `_Invocation` with the start message, if it's logged.
+
+        Arguments:
+            args, kwargs: Arguments of decorated functions. Not given for
+                context managers.
+        """
+        invocation = _Invocation()
+        traced = False
+        if TRACE.labels:
+            traced = self.is_traced(TRACE.labels)
+            if not traced and self.log_level <= logging.DEBUG:
+                return invocation
+        # Skip all work for disabled levels. `isEnabledFor` results are cached
+        # by `logging` and invalidated when its configuration changes.
+        if not traced and not self.logger.isEnabledFor(self.log_level):
+            return invocation
+        if (self.max_nesting is not None
+                and _nesting_depth(self.max_nesting) >= self.max_nesting):
+            return invocation
+        if self.depth_limit is not None:
+            invocation.depth_token, invocation.nested_calls = (
+                self.depth_limit.enter()
+            )
+            if invocation.nested_calls is None:
+                return invocation
+
+        invocation.log_kwargs = self.sample()
+        if invocation.log_kwargs is None:
+            return invocation
+        if traced:
+            invocation.log_kwargs['force'] = True
+        if self.extra:
+            self._add_extra(invocation.log_kwargs)
+
+        invocation.fields = fields = {'label': self.label}
+        if self.trackers:
+            invocation.tracker_states = [
+                (tracker, tracker.start(self.label))
+                for tracker in self.trackers
+            ]
+        if self._time_wall:
+            invocation.start_time = perf_counter()
+        if self._time_cpu:
+            invocation.cpu_start_time = thread_time()
+        if self.slow_threshold is not None:
+            # Arguments are formatted later, and only for slow calls.
+            return invocation
+
+        if args is not None:
+            fields['arguments'] = self.format_arguments(args, kwargs)
+        if self.start_template:
+            invocation.start_msg = self.format_template(self.start_template,
+                                                        **fields)
+        return invocation
+
+    def finish_message(self, invocation, args=None, kwargs=None,
+                       attributes=None):
+        """Return finish message for invocation, or None if not logged.
+
+        `invocation.log_kwargs` is updated with record attributes for wall
+        and CPU time, if `timing` is enabled, fields returned by trackers, and
+        the given `attributes`, which are also template fields.
+        """
+        if invocation.log_kwargs is None or not self.finish_template:
+            return None
+
+        fields = invocation.fields
+        if invocation.start_time is not None:
+            wall_time = perf_counter() - invocation.start_time
+            if (self.slow_threshold is not None
+                    and wall_time < self.slow_threshold):
+                return None
+            fields[WALL_TIME_ATTRIBUTE] = wall_time
+        if invocation.cpu_start_time is not None:
+            fields[CPU_TIME_ATTRIBUTE] = (
+                thread_time() - invocation.cpu_start_time
+            )
+        if self.slow_threshold is not None and args is not None:
+            fields['arguments'] = self.format_arguments(args, kwargs)
+
+        attributes = dict(attributes or {})
+        fields.update(attributes)
+        if self.timing:
+            attributes[WALL_TIME_ATTRIBUTE] = fields[WALL_TIME_ATTRIBUTE]
+            attributes[CPU_TIME_ATTRIBUTE] = fields[CPU_TIME_ATTRIBUTE]
+        if invocation.tracker_states is not None:
+            tracker_fields = self._stop_trackers(invocation)
+            fields.update(tracker_fields)
+            attributes.update(tracker_fields)
+        if attributes:
+            extra = dict(invocation.log_kwargs.get('extra', {}), **attributes)
+            invocation.log_kwargs = dict(invocation.log_kwargs, extra=extra)
+        if invocation.nested_calls is not None:
+            fields['nested_calls'] = invocation.nested_calls[0]
+        return self.format_template(self.finish_template, **fields)
+
+    def is_traced(self, labels):
+        """Return True if context is traced, ignoring the logger's level."""
+        if not self.matches_trace(labels):
+            return False
+        # Respect loggers disabled by configuration or `logging.disable`.
+        logger = self.logger
+        return not (logger.disabled
+                    or logger.manager.disable >= self.log_level)
+
+    def matches_trace(self, labels):
+        return self.label in labels
+
+    def end_invocation(self, invocation):
+        if invocation.tracker_states is not None:
+            # Finish message wasn't logged, but trackers must still stop.
+            self._stop_trackers(invocation)
+        if invocation.depth_token is not None:
+            self.depth_limit.exit(invocation.depth_token)
+
+    def _stop_trackers(self, invocation):
+        """Stop trackers in reverse order and return their fields."""
+        fields = {}
+        tracker_states, invocation.tracker_states = (
+            invocation.tracker_states, None
+        )
+        for tracker, state in reversed(tracker_states):
+            fields.update(tracker.stop(state))
+        return fields
+
+    def sample(self):
+        """Return keyword arguments for `log`, or None if call isn't sampled.
+
+        Records of sampled calls have a `sample_rate` attribute.
+        """
+        if self.sampler is None:
+            return {}
+        sample_rate = self.sampler.sample()
+        if sample_rate is None:
+            return None
+        return {'extra': {SAMPLE_RATE_ATTRIBUTE: sample_rate}}
+
+    def _add_extra(self, log_kwargs):
+        # Bound `extra` is shared, and only copied when merging is required.
+        sampled_extra = log_kwargs.get('extra')
+        if sampled_extra is None:
+            log_kwargs['extra'] = self.extra
+        else:
+            log_kwargs['extra'] = dict(self.extra, **sampled_extra)
+
+    def format_arguments(self, args, kwargs):
+        if not self.overhead_stats.enabled:
+            return self._format_function_args(args, kwargs)
+        start = perf_counter_ns()
+        arg_string = self._format_function_args(args, kwargs)
+        self.overhead_stats.add(self.label, overhead.ARGUMENT_FORMATTING,
+                                perf_counter_ns() - start)
+        return arg_string
+
+    def format_template(self, template, **fields):
+        if not self.overhead_stats.enabled:
+            return template.format(**fields)
+        start = perf_counter_ns()
+        msg = template.format(**fields)
+        self.overhead_stats.add(self.label, overhead.ARGUMENT_FORMATTING,
+                                perf_counter_ns() - start)
+        return msg
+
+    def _add_template_lookup_time(self):
+        if self._template_lookup_time is not None:
+            self.overhead_stats.add(self.label, overhead.TEMPLATE_LOOKUP,
+                                    self._template_lookup_time)
+            self._template_lookup_time = None
+
 
 class ContextLogger(_BaseContextLogger):
 
     context_type = 'context'
 
-    def __init__(self, templates, logger, log_level=logging.INFO, label=None):
-        super(ContextLogger, self).__init__(templates, logger,
-                                            log_level=log_level, label=label)
+    def __init__(self, templates, logger, **kwargs):
+        super(ContextLogger, self).__init__(templates, logger, **kwargs)
+        self._add_template_lookup_time()
+        self._invocation = None
+        self._registry_key = None
+        self._record_buffer = None
+        self._stack_token = None
 
     def __enter__(self):
-        if self.start_template:
-            self.log(self.start_template.format(label=self.label))
+        if not self.is_logged():
+            return
+        if REGISTRY.active:
+            self._registry_key = REGISTRY.register(self.label)
+        # Started before the label is added, so `max_nesting` only counts
+        # enclosing contexts, like for decorated functions.
+        self._invocation = invocation = self.start_invocation()
+        self._stack_token = _context_stack.set(
+            (self.label, _context_stack.get())
+        )
+        if invocation.start_msg:
+            self.log(invocation.start_msg, **invocation.log_kwargs)
+        if self.buffer_debug:
+            self._record_buffer = RecordBuffer(self.logger).__enter__()
 
     def __exit__(self, *args, **kwds):
-        if self.finish_template:
-            self.log(self.finish_template.format(label=self.label))
+        invocation, self._invocation = self._invocation, None
+        if invocation is None:
+            return
+        if self._registry_key is not None:
+            REGISTRY.unregister(self._registry_key)
+            self._registry_key = None
+        _context_stack.reset(self._stack_token)
+        if self._record_buffer is not None:
+            self._record_buffer.__exit__(*args)
+            self._record_buffer = None
+
+        try:
+            finish_msg = self.finish_message(invocation)
+            if finish_msg:
+                self.log(finish_msg, **invocation.log_kwargs)
+        finally:
+            self.end_invocation(invocation)
 
 
 class FunctionContextLogger(_BaseContextLogger):
 
     context_type = 'function'
 
-    def __init__(self, templates, logger, log_level=logging.INFO, label=None,
-                 show_args=False, show_kwargs=False):
-        super(FunctionContextLogger, self).__init__(
-            templates, logger, log_level=log_level, label=label
-        )
+    def __init__(self, templates, logger, show_args=False, show_kwargs=False,
+                 include=None, exclude=None, **kwargs):
+        super(FunctionContextLogger, self).__init__(templates, logger,
+                                                    **kwargs)
         self._format_function_args = functools.partial(
             utils.format_function_args,
             show_args=show_args,
             show_kwargs=show_kwargs,
         )
-
-    def __call__(self, func):
-        self.label = func.__name__
+        self.include = include
+        self.exclude = exclude
+        self.full_name = None
+        self.enabled = True
+
+    def __call__(self, func, label=None):
+        if isinstance(func, type):
+            return ClassContextLogger(self, include=self.include,
+                                      exclude=self.exclude)(func)
+
+        self.label = label or func.__name__
+        self.full_name = '{}.{}'.format(
+            func.__module__, getattr(func, '__qualname__', func.__name__),
+        )
+        self._add_template_lookup_time()
+        FUNCTIONS.register(self)
+
+        if iscoroutinefunction(func):
+            return wrap_coroutine_function(self, func)
+        if inspect.isgeneratorfunction(func):
+            return self._wrap_generator_function(func)
+        if (self.slow_threshold is not None and self.sampler is None
+                and self.depth_limit is None and not self.trackers
+                and not self._time_cpu):
+            return self._decorate_slow_only(func)
 
         @functools.wraps(func)
         def decorated_func(*args, **kwargs):
-            arg_string = self._format_function_args(args, kwargs)
-            log_kwargs = {'label': self.label, 'arguments': arg_string}
+            if not (self.enabled and self.is_logged()):
+                return func(*args, **kwargs)
+            invocation = self.start_invocation(args, kwargs)
+            try:
+                if invocation.start_msg:
+                    self.log(invocation.start_msg, **invocation.log_kwargs)
+                output = self._call(func, args, kwargs)
+                finish_msg = self.finish_message(invocation, args, kwargs)
+                if finish_msg:
+                    self.log(finish_msg, **invocation.log_kwargs)
+            finally:
+                self.end_invocation(invocation)
+            return output
+
+        return decorated_func
 
-            if self.start_template:
-                self.log(self.start_template.format(**log_kwargs))
-            output = func(*args, **kwargs)
-            if self.finish_template:
-                self.log(self.finish_template.format(**log_kwargs))
+    def _decorate_slow_only(self, func):
+        """Return decorated function that only logs calls slower than limit.
 
+        Fast calls only check the level, read the timer twice and track the
+        context label. The invocation, arguments and message are only created
+        for slow calls.
+        """
+        @functools.wraps(func)
+        def decorated_func(*args, **kwargs):
+            if not (self.enabled and self.is_logged()):
+                return func(*args, **kwargs)
+            start_time = perf_counter()
+            output = self._call(func, args, kwargs)
+            if perf_counter() - start_time < self.slow_threshold:
+                return output
+
+            invocation = self.start_invocation(args, kwargs)
+            invocation.start_time = start_time
+            try:
+                finish_msg = self.finish_message(invocation, args, kwargs)
+                if finish_msg:
+                    self.log(finish_msg, **invocation.log_kwargs)
+            finally:
+                self.end_invocation(invocation)
             return output
 
         return decorated_func
 
+    def matches_trace(self, labels):
+        return self.label in labels or self.full_name in labels
+
+    def _wrap_generator_function(self, func):
+        @functools.wraps(func)
+        def decorated_func(*args, **kwargs):
+            if not (self.enabled and self.is_logged()):
+                return func(*args, **kwargs)
+            if delegate_generator is None:  # Python 2
+                return self._generate(func, args, kwargs)
+            return delegate_generator(self, func, args, kwargs)
+
+        return decorated_func
+
+    def _generate(self, func, args, kwargs, result=None, stacklevel=3):
+        """Delegate to generator and log its start and finish.
+
+        The start is logged on the first `next`, and the finish on exhaustion
+        or `close`. The finish record has the number of items yielded and the
+        seconds spent inside the generator, excluding time spent by the
+        consumer between items. The generator's return value is stored as
+        the only item of `result`, if given, since generators can't return
+        values on Python 2. Generators delegating to this one pass a higher
+        `stacklevel`, so records still point at the consumer.
+        """
+        generator = func(*args, **kwargs)
+        invocation = self.start_invocation(args, kwargs)
+        try:
+            if invocation.start_msg:
+                self.log(invocation.start_msg, stacklevel=stacklevel,
+                         **invocation.log_kwargs)
+
+            items = 0
+            active_time = 0.0
+            value, exception = None, None
+            while True:
+                start = perf_counter()
+                try:
+                    with self.call_context():
+                        if exception is None:
+                            item = generator.send(value)
+                        else:
+                            item = generator.throw(exception)
+                except StopIteration as stop:
+                    active_time += perf_counter() - start
+                    if result is not None:
+                        result[:] = [getattr(stop, 'value', None)]
+                    break
+                finally:
+                    exception = None
+                active_time += perf_counter() - start
+                items += 1
+
+                try:
+                    value = yield item
+                except GeneratorExit:
+                    generator.close()
+                    break
+                except BaseException:
+                    exception = sys.exc_info()[1]
+
+            finish_msg = self.finish_message(invocation, args, kwargs, {
+                ITEMS_ATTRIBUTE: items,
+                ACTIVE_TIME_ATTRIBUTE: active_time,
+            })
+            if finish_msg:
+                self.log(finish_msg, stacklevel=stacklevel,
+                         **invocation.log_kwargs)
+        finally:
+            self.end_invocation(invocation)
+
+    def copy(self):
+        """Return copy sharing templates, with a fresh sampler and limit."""
+        context_logger = copy.copy(self)
+        if self.sampler is not None:
+            context_logger.sampler = AdaptiveSampler(self.sampler.budget,
+                                                     self.sampler.window)
+        if self.depth_limit is not None:
+            context_logger.depth_limit = DepthLimit(
+                self.depth_limit.max_depth,
+            )
+        return context_logger
+
+    def _call(self, func, args, kwargs):
+        # Same as `call_context`, inlined since this runs on every call.
+        stack_token = _context_stack.set((self.label, _context_stack.get()))
+        registry_key = (REGISTRY.register(self.label) if REGISTRY.active
+                        else None)
+        try:
+            if self.buffer_debug:
+                with RecordBuffer(self.logger):
+                    return func(*args, **kwargs)
+            return func(*args, **kwargs)
+        finally:
+            _context_stack.reset(stack_token)
+            if registry_key is not None:
+                REGISTRY.unregister(registry_key)
+
+    def call_context(self):
+        """Return context manager for calls of the decorated function."""
+        return _CallContext(self)
+
+
+class _CallContext(object):
+    """Context of a call of a decorated function.
+
+    The label is added to `get_context_labels` and, if a watchdog is running,
+    to its registry. Debug records are buffered if `buffer_debug` is set.
+    """
+
+    __slots__ = ('context_logger', 'stack_token', 'registry_key',
+                 'record_buffer')
+
+    def __init__(self, context_logger):
+        self.context_logger = context_logger
+        self.stack_token = None
+        self.registry_key = None
+        self.record_buffer = None
+
+    def __enter__(self):
+        context_logger = self.context_logger
+        label = context_logger.label
+        self.stack_token = _context_stack.set((label, _context_stack.get()))
+        if REGISTRY.active:
+            self.registry_key = REGISTRY.register(label)
+        if context_logger.buffer_debug:
+            self.record_buffer = RecordBuffer(context_logger.logger)
+            self.record_buffer.__enter__()
+
+    def __exit__(self, *exc_info):
+        if self.record_buffer is not None:
+            self.record_buffer.__exit__(*exc_info)
+        _context_stack.reset(self.stack_token)
+        if self.registry_key is not None:
+            REGISTRY.unregister(self.registry_key)
+
+
+class ClassContextLogger(object):
+    """Class decorator wrapping selected methods with context loggers.
+
+    Each method is wrapped once, when the class is decorated. Method loggers
+    only hold their label, full name and runtime switch. Templates, level,
+    trackers, sampler and depth limit are shared by all methods of the class,
+    so sample budgets and depth limits apply per class. Labels are
+    `ClassName.method_name`. Static methods, class methods, properties and
+    coroutine methods are supported.
+
+    Arguments:
+        function_logger: `FunctionContextLogger` used as template for methods.
+        include: Glob patterns of method names to wrap. Defaults to all
+            methods whose name doesn't start with an underscore.
+        exclude: Glob patterns of method names not to wrap.
+    """
+
+    def __init__(self, function_logger, include=None, exclude=None):
+        self.function_logger = function_logger
+        self.include = _as_patterns(include, default=('[!_]*',))
+        self.exclude = _as_patterns(exclude, default=())
+
+    def __call__(self, cls):
+        self._method_logger_class = _shared_logger_class(
+            self.function_logger.copy(),
+        )
+        for name, attribute in list(vars(cls).items()):
+            if not self._is_selected(name):
+                continue
+            wrapped = self._wrap_attribute(cls, attribute)
+            if wrapped is not None:
+                setattr(cls, name, wrapped)
+        return cls
+
+    def _is_selected(self, name):
+        return (
+            any(fnmatch.fnmatchcase(name, p) for p in self.include)
+            and not any(fnmatch.fnmatchcase(name, p) for p in self.exclude)
+        )
+
+    def _wrap_attribute(self, cls, attribute):
+        if isinstance(attribute, (staticmethod, classmethod)):
+            return type(attribute)(
+                self._wrap_function(cls, attribute.__func__)
+            )
+        if isinstance(attribute, property):
+            return property(
+                *[None if f is None else self._wrap_function(cls, f)
+                  for f in (attribute.fget, attribute.fset, attribute.fdel)],
+                doc=attribute.__doc__
+            )
+        if inspect.isfunction(attribute):
+            return self._wrap_function(cls, attribute)
+        return None
+
+    def _wrap_function(self, cls, func):
+        label = '{}.{}'.format(cls.__name__, func.__name__)
+        method_logger_class = self._method_logger_class
+        method_logger = method_logger_class.__new__(method_logger_class)
+        return method_logger(func, label=label)
+
+
+def _shared_logger_class(context_logger):
+    """Return subclass with attributes of `context_logger` as class attributes.
+
+    Instances created with `__new__` share the settings of `context_logger`
+    through their class, and only store attributes set per instance, such as
+    labels. Attributes that are descriptors, such as functions and, on newer
+    Pythons, `functools.partial` objects, are wrapped in `staticmethod` so
+    they aren't bound to instances.
+    """
+    cls = type(context_logger)
+    attributes = {
+        name: staticmethod(value) if hasattr(type(value), '__get__') else value
+        for name, value in vars(context_logger).items()
+    }
+    return type(cls.__name__, (cls,), attributes)
+
+
+def _as_patterns(patterns, default):
+    if patterns is None:
+        return default
+    if isinstance(patterns, str):
+        return (patterns,)
+    return tuple(patterns)
+
+
+class _TemplateCache(object):
+    """Templates with cached lookups, since cascading lookups are slow."""
+
+    def __init__(self, templates):
+        self.templates = templates
+        self._cache = {}
+
+    def get(self, key):
+        try:
+            return self._cache[key]
+        except KeyError:
+            template = self._cache[key] = self.templates.get(key)
+            return template
+
 
 class _ContextLoggerFactory:
     """Factory returning a `ContextLogger` for a specific logging level.
 
     Note that each use as a context manager or decorator creates a new instance
-    of `ContextLogger` or `FunctionContextLogger`.
+    of `ContextLogger` or `FunctionContextLogger`. Samplers and depth limits
+    are shared by context managers with the same label, for up to
+    `MAX_SHARED_LABELS` recently used labels.
     """
 
-    def __init__(self, logger, log_level, templates):
+    def __init__(self, logger, log_level, templates, overhead_stats=None):
         self.logger = utils.get_logger(logger)
         self.log_level = log_level
-        self.templates = templates
-
-    def __call__(self, func_or_label=None, show_args=False, show_kwargs=False):
+        self.templates = _TemplateCache(templates)
+        self.overhead_stats = overhead_stats
+        self.extra = None
+        self._shared = OrderedDict()
+
+    def bind(self, extra):
+        """Return copy whose context loggers add `extra` to records."""
+        factory = copy.copy(self)
+        factory.extra = extra
+        return factory
+
+    def __call__(self, func_or_label=None, show_args=False, show_kwargs=False,
+                 slow_threshold=None, buffer_debug=False, sample_budget=None,
+                 max_depth=None, max_nesting=None, timing=False,
+                 track_memory=None, profile=None, include=None, exclude=None):
+        """Return context logger for label, decorated function or class.
+
+        Arguments:
+            func_or_label: Function or class to decorate, or label for context
+                manager. Decorated classes have their methods wrapped, see
+                `ClassContextLogger`.
+            show_args: If True, include positional arguments in templates for
+                decorated functions.
+            show_kwargs: If True, include keyword arguments in templates for
+                decorated functions.
+            slow_threshold: If given, only log when the context or function
+                takes longer than this number of seconds. Only the finish
+                template is logged and it receives a `wall_time` field.
+            buffer_debug: If True, DEBUG records emitted inside the context or
+                function are held back and only passed to handlers if it
+                raises an exception.
+            sample_budget: If given, adaptively sample calls so that at most
+                this many calls per second are logged for each label. Records
+                have a `sample_rate` attribute with the current sample rate.
+            max_depth: If given, nested entries of the same label (e.g.
+                recursive calls) past this depth are counted but not logged.
+                The finish template receives the count as `nested_calls`. Must
+                be at least 1.
+            max_nesting: If given, entries inside this many open contexts or
+                more, of any label, aren't logged. Unlike `max_depth`, this
+                limits mutual recursion, such as `visit_node` calling
+                `visit_children` calling `visit_node`. Must be at least 1.
+            timing: If True, finish records have `wall_time` and `cpu_time`
+                attributes with the seconds spent in the context or function.
+                Timers also run if the finish template uses these fields.
+                CPU time is measured for the current thread, where supported.
+            track_memory: If given, report memory growth across the context
+                or function in the `memory_delta` template field and record
+                attribute. Either 'rss' for the cheap growth of peak RSS, or
+                'tracemalloc' to trace allocations, which also adds the top
+                allocation sites as a `memory_top` record attribute. A
+                tracker from `logquacious.memory` can also be given. True
+                is the same as 'rss'.
+            profile: If given, run invocations under `cProfile`. Either True,
+                the fraction of invocations to profile, or a `Profiler` from
+                `logquacious.profiling`. Finish records of profiled
+                invocations have a `profile_stats` attribute with the top
+                functions by cumulative time.
+            include: Glob pattern, or patterns, of method names wrapped in
+                decorated classes. Defaults to names not starting with `_`.
+            exclude: Glob pattern, or patterns, of method names not wrapped
+                in decorated classes.
+        """
+        kwargs = dict(
+            templates=self.templates,
+            logger=self.logger,
+            log_level=self.log_level,
+            slow_threshold=slow_threshold,
+            buffer_debug=buffer_debug,
+            overhead_stats=self.overhead_stats,
+            max_nesting=max_nesting,
+            timing=timing,
+            trackers=_get_trackers(track_memory, profile),
+            extra=self.extra,
+        )
         if func_or_label is None or callable(func_or_label):
             decorator = FunctionContextLogger(
-                templates=self.templates,
-                logger=self.logger,
-                log_level=self.log_level,
                 show_args=show_args,
                 show_kwargs=show_kwargs,
+                include=include,
+                exclude=exclude,
+                sampler=(None if sample_budget is None
+                         else AdaptiveSampler(sample_budget)),
+                depth_limit=(None if max_depth is None
+                             else DepthLimit(max_depth)),
+                **kwargs
             )
             if func_or_label is None:
                 return decorator
             # Decorator called without arguments so argument is function.
             return decorator(func_or_label)
         return ContextLogger(
-            templates=self.templates,
-            logger=self.logger,
-            log_level=self.log_level,
             label=func_or_label,
+            sampler=self._get_shared(func_or_label, AdaptiveSampler,
+                                     sample_budget),
+            depth_limit=self._get_shared(func_or_label, DepthLimit,
+                                         max_depth),
+            **kwargs
         )
+
+    def _get_shared(self, label, cls, value):
+        """Return `cls(value)` shared by context managers with `label`."""
+        if value is None:
+            return None
+        key = (label, cls, value)
+        # Reinsert entries on use, so the oldest entry is the least recently
+        # used one. Dynamic labels would otherwise grow the dict without bound.
+        shared = self._shared.pop(key, None)
+        if shared is None:
+            shared = cls(value)
+            if len(self._shared) >= MAX_SHARED_LABELS:
+                self._shared.popitem(last=False)
+        self._shared[key] = shared
+        return shared
+
+
+def _get_trackers(track_memory, profile):
+    trackers = []
+    if track_memory not in (None, False):
+        trackers.append(get_memory_tracker(track_memory))
+    # The profiler starts last, so it doesn't profile other trackers.
+    if profile not in (None, False):
+        trackers.append(get_profiler(profile))
+    return tuple(trackers)
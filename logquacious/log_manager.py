@@ -1,10 +1,19 @@
+import copy
+import functools
 import logging
+import sys
 
 from . import utils
+from ._compat import MappingProxyType, perf_counter
+from .handlers import FlightRecorderHandler
 from .log_context import LogContext
 from .backport_configurable_stacklevel import PatchedLoggerMixin
 
 
+#: Keyword arguments of `logging.Logger.log`, which aren't format fields.
+_LOG_KWARGS = ('exc_info', 'extra', 'stack_info', 'stacklevel')
+
+
 class LogManager(PatchedLoggerMixin):
     """Logging manager for use as a logger, decorator, or contextmanager.
 
@@ -27,22 +36,157 @@ class LogManager(PatchedLoggerMixin):
         [DEBUG] Start context manager
         [INFO] Inside context manger
         [DEBUG] Finish context manager
+
+    With `style='{'`, log methods take `str.format` style messages. Keyword
+    arguments are format fields, which are also added as record attributes,
+    and messages are only formatted when a handler formats the record:
+
+    >>> log = LogManager(__name__, style='{')
+    >>> log.info('user {user} took {ms:.1f}ms', user='tony', ms=12.34)
+
+        [INFO] user tony took 12.3ms
+
+    `bind` returns a child manager whose records, including records of
+    `context` loggers, have the given fields as attributes:
+
+    >>> request_log = log.bind(request_id=42)
+    >>> request_log.info('Handling request')
     """
 
-    def __init__(self, name=None, context_templates=None):
+    def __init__(self, name=None, context_templates=None, style='%'):
         super(LogManager, self).__init__()
 
         self.logger = utils.get_logger(name)
         self.context = LogContext(self.logger, context_templates)
+        #: `OverheadStats` for time spent in `context` loggers. Disabled by
+        #: default; enable with `log.overhead.enable()`.
+        self.overhead = self.context.overhead
+
+        if style not in ('%', '{'):
+            raise ValueError("Unknown style {!r}. Expected '%' or '{{'"
+                             .format(style))
+        self.style = style
+        #: Read-only mapping of record attributes added by `bind`, or None.
+        self.extra = None
+        self._set_log_methods()
+
+    def _set_log_methods(self):
+        if self.style == '{':
+            log = self._log_brace
+        elif self.extra:
+            log = self._log_extra
+        else:
+            # Alias `logging.Logger` methods:
+            self.log = self.logger.log
+            self.debug = self.logger.debug
+            self.info = self.logger.info
+            self.warning = self.logger.warning
+            self.error = self.logger.error
+            self.exception = self.logger.exception
+            self.fatal = self.logger.fatal
+            return
+
+        # Partials add no frames to the stack.
+        self.log = log
+        self.debug = functools.partial(log, logging.DEBUG)
+        self.info = functools.partial(log, logging.INFO)
+        self.warning = functools.partial(log, logging.WARNING)
+        self.error = functools.partial(log, logging.ERROR)
+        self.exception = functools.partial(log, logging.ERROR, exc_info=True)
+        self.fatal = functools.partial(log, logging.CRITICAL)
+
+    def bind(self, **fields):
+        """Return child manager adding `fields` as attributes of records.
+
+        The child shares the logger, templates and settings of this manager.
+        Fields are merged with fields bound to this manager once, when
+        binding, so logging calls don't copy them.
+        """
+        child = copy.copy(self)
+        extra = dict(self.extra or {})
+        extra.update(fields)
+        child.extra = MappingProxyType(extra)
+        child.context = self.context.bind(child.extra)
+        child._set_log_methods()
+        return child
+
+    def _merge_extra(self, extra):
+        """Return bound `extra` updated with `extra` of a logging call."""
+        if not extra:
+            return self.extra
+        if not self.extra:
+            return extra
+        merged = dict(self.extra)
+        merged.update(extra)
+        return merged
+
+    def _log_extra(self, level, msg, *args, **kwargs):
+        """Log message with bound `extra` record attributes."""
+        if not self.logger.isEnabledFor(level):
+            return
+        kwargs['extra'] = self._merge_extra(kwargs.get('extra'))
+        # This method adds a level to the stack.
+        kwargs['stacklevel'] = kwargs.get('stacklevel', 1) + 1
+        with self.temp_monkey_patched_logger():
+            self.logger.log(level, msg, *args, **kwargs)
+
+    def _log_brace(self, level, msg, *args, **kwargs):
+        """Log `str.format` style message formatted when the record is."""
+        if not self.logger.isEnabledFor(level):
+            return
+        log_kwargs = {key: kwargs.pop(key) for key in _LOG_KWARGS
+                      if key in kwargs}
+        # This method adds a level to the stack.
+        log_kwargs['stacklevel'] = log_kwargs.get('stacklevel', 1) + 1
+        extra = log_kwargs.get('extra')
+        if kwargs:
+            extra = dict(extra or {})
+            extra.update(
+                (key, value) for key, value in kwargs.items()
+                if key not in utils.RESERVED_RECORD_ATTRIBUTES
+            )
+        log_kwargs['extra'] = self._merge_extra(extra)
+        with self.temp_monkey_patched_logger():
+            self.logger.log(level, utils.BraceMessage(msg, args, kwargs),
+                            **log_kwargs)
+
+    def log_lazy(self, level, msg, *args, **kwargs):
+        """Log with message and arguments evaluated only when formatted.
+
+        If `msg` or any of `args` is callable, it's wrapped in `utils.Lazy`,
+        so it's called only if the level is enabled and a handler formats the
+        record. Use `%s` or `%r` placeholders for lazy arguments::
+
+            log.debug_lazy('State: %s', lambda: json.dumps(state))
+        """
+        self._log_lazy(level, msg, args, kwargs)
+
+    def debug_lazy(self, msg, *args, **kwargs):
+        self._log_lazy(logging.DEBUG, msg, args, kwargs)
+
+    def info_lazy(self, msg, *args, **kwargs):
+        self._log_lazy(logging.INFO, msg, args, kwargs)
+
+    def warning_lazy(self, msg, *args, **kwargs):
+        self._log_lazy(logging.WARNING, msg, args, kwargs)
+
+    def error_lazy(self, msg, *args, **kwargs):
+        self._log_lazy(logging.ERROR, msg, args, kwargs)
 
-        # Alias `logging.Logger` methods:
-        self.log = self.logger.log
-        self.debug = self.logger.debug
-        self.info = self.logger.info
-        self.warning = self.logger.warning
-        self.error = self.logger.error
-        self.exception = self.logger.exception
-        self.fatal = self.logger.fatal
+    def fatal_lazy(self, msg, *args, **kwargs):
+        self._log_lazy(logging.CRITICAL, msg, args, kwargs)
+
+    def _log_lazy(self, level, msg, args, kwargs):
+        if not self.logger.isEnabledFor(level):
+            return
+        # Stacklevel 3: This method, the public `*_lazy` method and its caller.
+        kwargs.setdefault('stacklevel', 3)
+        if self.extra:
+            kwargs['extra'] = self._merge_extra(kwargs.get('extra'))
+        args = [utils.lazy_if_callable(arg) for arg in args]
+        with self.temp_monkey_patched_logger():
+            self.logger.log(level, utils.lazy_if_callable(msg), *args,
+                            **kwargs)
 
     def and_suppress(self, allowed_exceptions,
                      msg="Suppressed error and logging",
@@ -68,9 +212,14 @@ class LogManager(PatchedLoggerMixin):
 
     def and_reraise(self, allowed_exceptions,
                     msg="Logging error and reraising",
-                    level=logging.ERROR, exc_info=True, stacklevel=3):
+                    level=logging.ERROR, exc_info=True, stacklevel=3,
+                    propagated_msg=None):
         """Context manager that logs and reraises given error.
 
+        Exceptions are only logged once: If an exception was already logged by
+        an inner `and_reraise`, outer layers log `propagated_msg`, without
+        exception info, or nothing at all if `propagated_msg` is None.
+
         Arguments:
             allowed_exceptions: Exception(s) to log before reraising.
             msg: Message logged for exceptions.
@@ -80,10 +229,93 @@ class LogManager(PatchedLoggerMixin):
                 since this method (level=2) defers functionality to a helper
                 utility (level=1), but logging should use the context where
                 this is called (level=3).
+            propagated_msg: Message logged for exceptions that were already
+                logged by a nested `and_reraise`.
         """
         def on_exception():
-            with self.temp_monkey_patched_logger():
-                self.log(level, msg, exc_info=exc_info, stacklevel=stacklevel)
+            exception = sys.exc_info()[1]
+            if not utils.is_exception_logged(exception):
+                # Only mark exceptions that are actually logged, so outer
+                # layers still log exceptions ignored at a disabled level.
+                if self.logger.isEnabledFor(level):
+                    utils.mark_exception_logged(exception)
+                with self.temp_monkey_patched_logger():
+                    self.log(level, msg, exc_info=exc_info,
+                             stacklevel=stacklevel)
+            elif propagated_msg:
+                with self.temp_monkey_patched_logger():
+                    self.log(level, propagated_msg, stacklevel=stacklevel)
             raise
 
         return utils.HandleException(allowed_exceptions, on_exception)
+
+    def suppress_each(self, iterable, allowed_exceptions, func=None,
+                      msg="Suppressed error for item and logging",
+                      level=logging.ERROR, exc_info=True, max_logged=None,
+                      summary_msg="Processed {processed} items with "
+                                  "{failed} failures",
+                      summary_level=logging.INFO, stacklevel=3):
+        """Iterate items, logging and skipping items that raise given errors.
+
+        Unlike wrapping each item in `and_suppress`, this doesn't create a
+        context manager per item. Results are yielded lazily, and a summary
+        is logged when iteration finishes.
+
+        >>> log = LogManager(__name__)
+        >>> results = log.suppress_each(['1', 'x', '3'], ValueError, func=int)
+        >>> list(results)
+        [1, 3]
+        >>> results.processed, results.failed
+        (3, 1)
+
+        Arguments:
+            iterable: Items to iterate.
+            allowed_exceptions: Exception(s) to log and suppress.
+            func: If given, yield `func(item)` for each item, skipping items
+                for which it raises one of `allowed_exceptions`.
+            msg: Message logged for exceptions.
+            level: Logging level for logging exceptions.
+            exc_info: If True, include exception info.
+            max_logged: If given, log at most this many exceptions per second.
+                Exceptions over the limit are still counted.
+            summary_msg: Message logged when iteration finishes, formatted
+                with `processed` and `failed` counts, which are also record
+                attributes. If None, no summary is logged.
+            summary_level: Logging level for the summary.
+            stacklevel: Stacklevel of logging statements. Defaults to level 3
+                since callbacks (level=1) are called by the iterating
+                generator (level=2), but logging should use the context where
+                items are consumed (level=3).
+
+        Returns:
+            `utils.SuppressEach` iterable with `processed` and `failed` counts.
+        """
+        window = [None, 0]  # Start time and count of logged exceptions.
+
+        def on_exception():
+            if max_logged is not None:
+                now = perf_counter()
+                if window[0] is None or now - window[0] >= 1:
+                    window[:] = [now, 0]
+                if window[1] >= max_logged:
+                    return
+                window[1] += 1
+            with self.temp_monkey_patched_logger():
+                self.log(level, msg, exc_info=exc_info, stacklevel=stacklevel)
+
+        def on_finish(counts):
+            if summary_msg is None:
+                return
+            fields = {'processed': counts.processed, 'failed': counts.failed}
+            with self.temp_monkey_patched_logger():
+                self.log(summary_level, summary_msg.format(**fields),
+                         extra=fields, stacklevel=stacklevel)
+
+        return utils.SuppressEach(iterable, allowed_exceptions, on_exception,
+                                  on_finish, func=func)
+
+    def dump_flight_recorder(self):
+        """Dump records held by any `FlightRecorderHandler` of the logger."""
+        for handler in utils.iter_handlers(self.logger):
+            if isinstance(handler, FlightRecorderHandler):
+                handler.dump()
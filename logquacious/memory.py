@@ -0,0 +1,151 @@
+"""
+Memory growth tracking for context managers and decorators.
+
+Trackers measure memory growth between `start(label)` and `stop(state)`, where
+`state` is returned by `start`. `stop` returns a dict of template fields,
+which are also added as attributes of the finish record.
+"""
+import sys
+import threading
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+try:
+    import tracemalloc
+except ImportError:  # Python 2
+    tracemalloc = None
+
+
+__all__ = ['RssTracker', 'TracemallocTracker', 'get_memory_tracker']
+
+
+#: Record attribute and template field with the memory growth in bytes.
+MEMORY_DELTA_ATTRIBUTE = 'memory_delta'
+#: Record attribute with the top allocation sites, for `TracemallocTracker`.
+MEMORY_TOP_ATTRIBUTE = 'memory_top'
+
+# `ru_maxrss` is in bytes on macOS and in kilobytes elsewhere.
+_MAXRSS_SCALE = 1 if sys.platform == 'darwin' else 1024
+
+
+class RssTracker(object):
+    """Tracker reporting growth of the peak resident set size (RSS).
+
+    This is cheap, but only reports growth when the process reaches a new peak
+    RSS, and only measures the whole process.
+    """
+
+    def __init__(self):
+        if resource is None:
+            raise RuntimeError("RSS tracking requires the `resource` module")
+
+    def start(self, label):
+        return self._max_rss()
+
+    def stop(self, state):
+        return {MEMORY_DELTA_ATTRIBUTE: self._max_rss() - state}
+
+    def _max_rss(self):
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        return usage.ru_maxrss * _MAXRSS_SCALE
+
+
+class _TracingUsers(object):
+    """Count of active `TracemallocTracker` invocations.
+
+    Tracing is started by the first invocation, if needed, and only stopped
+    when the last one finishes, even if invocations overlap across threads or
+    asyncio tasks rather than nest.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._count = 0
+        self._started = False
+
+    def acquire(self):
+        with self._lock:
+            if self._count == 0:
+                self._started = not tracemalloc.is_tracing()
+                if self._started:
+                    tracemalloc.start()
+            self._count += 1
+
+    def release(self):
+        with self._lock:
+            self._count -= 1
+            if self._count == 0 and self._started:
+                tracemalloc.stop()
+                self._started = False
+
+
+_tracing_users = _TracingUsers()
+
+
+class TracemallocTracker(object):
+    """Tracker reporting traced memory growth and top allocation sites.
+
+    Tracing is started if needed and stopped when the last tracked context
+    finishes. Tracing slows down allocations significantly, so this is
+    meant for diagnosing specific stages.
+
+    Arguments:
+        top: Number of allocation sites with the largest growth to report.
+    """
+
+    def __init__(self, top=10):
+        if tracemalloc is None:
+            raise RuntimeError("Memory tracing requires `tracemalloc`")
+        self.top = top
+
+    def start(self, label):
+        _tracing_users.acquire()
+        snapshot = tracemalloc.take_snapshot() if self.top else None
+        return tracemalloc.get_traced_memory()[0], snapshot
+
+    def stop(self, state):
+        start_size, start_snapshot = state
+        fields = {
+            MEMORY_DELTA_ATTRIBUTE:
+                tracemalloc.get_traced_memory()[0] - start_size,
+        }
+        if start_snapshot is not None:
+            stats = tracemalloc.take_snapshot().compare_to(start_snapshot,
+                                                           'lineno')
+            fields[MEMORY_TOP_ATTRIBUTE] = [
+                str(stat) for stat in stats[:self.top]
+            ]
+        _tracing_users.release()
+        return fields
+
+
+_TRACKERS = {
+    'rss': RssTracker,
+    'tracemalloc': TracemallocTracker,
+}
+
+
+def get_memory_tracker(track_memory):
+    """Return memory tracker for `track_memory` option.
+
+    Arguments:
+        track_memory: 'rss', 'tracemalloc', True for 'rss', or a tracker
+            instance.
+    """
+    if track_memory is True:
+        track_memory = 'rss'
+    if not isinstance(track_memory, str):
+        if not (hasattr(track_memory, 'start')
+                and hasattr(track_memory, 'stop')):
+            msg = "Expected memory tracker name or instance, got {!r}"
+            raise ValueError(msg.format(track_memory))
+        return track_memory
+    try:
+        tracker_class = _TRACKERS[track_memory]
+    except KeyError:
+        msg = "Unknown memory tracker {!r}. Expected one of: {}"
+        raise ValueError(msg.format(track_memory, sorted(_TRACKERS)))
+    return tracker_class()
@@ -0,0 +1,170 @@
+"""
+Aggregate logging from process-pool workers in the parent process.
+
+Workers install a `WorkerQueueHandler` through the pool initializer. It sends
+compact, picklable records over a multiprocessing queue, and a listener thread
+in the parent passes them on to the parent's handlers in batches.
+"""
+import logging
+import multiprocessing
+import operator
+import pickle
+
+from . import utils
+from .handlers import RECORD_FIELDS
+from .nonblocking import BatchingQueueListener
+
+
+__all__ = ['ProcessLogAggregator', 'WorkerQueueHandler']
+
+
+#: Record attributes sent from workers. Messages are pre-rendered and exception
+#: info is sent as text, so `msg`, `args`, and `exc_info` aren't sent. Extra
+#: attributes are sent as well, see `compact_record`.
+PICKLED_RECORD_FIELDS = tuple(
+    name for name in RECORD_FIELDS if name not in ('msg', 'args', 'exc_info')
+)
+
+_get_pickled_fields = operator.attrgetter(*PICKLED_RECORD_FIELDS)
+_exception_formatter = logging.Formatter()
+
+
+def compact_record(record):
+    """Return picklable tuple of record values for `restore_record`.
+
+    Extra attributes, such as fields bound with `LogManager.bind`, are sent
+    as is if they can be pickled, and as their `repr` otherwise.
+    """
+    if record.exc_info and not record.exc_text:
+        record.exc_text = _exception_formatter.formatException(record.exc_info)
+    return _get_pickled_fields(record) + (
+        record.getMessage(), record.exc_text, _picklable_extra(record),
+    )
+
+
+def restore_record(values):
+    """Return `LogRecord` from values returned by `compact_record`."""
+    attributes = dict(zip(PICKLED_RECORD_FIELDS, values))
+    attributes['msg'], attributes['exc_text'], extra = values[-3:]
+    attributes.update(extra)
+    return logging.makeLogRecord(attributes)
+
+
+def _picklable_extra(record):
+    extra = utils.get_extra_attributes(record)
+    if not extra:
+        return extra
+    try:
+        pickle.dumps(extra, pickle.HIGHEST_PROTOCOL)
+    except Exception:
+        extra = {name: _picklable(value) for name, value in extra.items()}
+    return extra
+
+
+def _picklable(value):
+    try:
+        pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+    except Exception:
+        return repr(value)
+    return value
+
+
+class WorkerQueueHandler(logging.Handler):
+    """Handler sending compact records to a multiprocessing queue.
+
+    Records are put on the queue as soon as they're handled. The queue's
+    feeder thread pickles and sends them, so records aren't lost when a pool
+    is terminated right after its tasks return, e.g. when leaving a
+    `with multiprocessing.Pool(...)` block.
+
+    Arguments:
+        queue: Multiprocessing queue shared with the parent process.
+    """
+
+    def __init__(self, queue, level=logging.NOTSET):
+        super(WorkerQueueHandler, self).__init__(level=level)
+        self.queue = queue
+
+    def emit(self, record):
+        try:
+            self.queue.put(compact_record(record))
+        except Exception:
+            self.handleError(record)
+
+
+def install_worker_handler(queue, level):
+    """Pool initializer replacing root handlers with a `WorkerQueueHandler`."""
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.setLevel(level)
+    root.addHandler(WorkerQueueHandler(queue))
+
+
+class ProcessQueueListener(BatchingQueueListener):
+    """Listener for records sent by `WorkerQueueHandler`.
+
+    If no handlers are given, records are passed to the parent's logger with
+    the name of the record, like records logged in the parent process.
+    """
+
+    def handle_batch(self, batch):
+        records = [restore_record(values) for values in batch]
+        if self.handlers:
+            super(ProcessQueueListener, self).handle_batch(records)
+            return
+        for record in records:
+            logger = logging.getLogger(record.name)
+            if logger.isEnabledFor(record.levelno):
+                logger.handle(record)
+
+
+class ProcessLogAggregator(object):
+    """Send logging from process-pool workers to the parent process.
+
+    Pass `initializer` and `initargs` to `multiprocessing.Pool` or
+    `concurrent.futures.ProcessPoolExecutor`::
+
+        with ProcessLogAggregator() as aggregator:
+            with ProcessPoolExecutor(initializer=aggregator.initializer,
+                                     initargs=aggregator.initargs) as pool:
+                pool.map(task, items)
+
+    Arguments:
+        handlers: Handlers receiving worker records in the parent. By default,
+            records are passed to the parent logger matching the record name.
+        level: Root logger level in workers. Defaults to the parent's root
+            logger level.
+        batch_size: Maximum number of records handled at once.
+        mp_context: Multiprocessing context used to create the queue.
+    """
+
+    #: Pool initializer installing the worker handler.
+    initializer = staticmethod(install_worker_handler)
+
+    def __init__(self, handlers=None, level=None, batch_size=100,
+                 mp_context=None):
+        if level is None:
+            level = logging.getLogger().level
+        self.level = level
+        self.queue = (mp_context or multiprocessing).Queue()
+        self.listener = ProcessQueueListener(self.queue, handlers or [],
+                                             batch_size=batch_size)
+
+    @property
+    def initargs(self):
+        return (self.queue, self.level)
+
+    def start(self):
+        self.listener.start()
+
+    def stop(self):
+        """Handle records sent by workers and stop the listener thread."""
+        self.listener.stop()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *args):
+        self.stop()
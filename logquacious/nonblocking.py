@@ -0,0 +1,244 @@
+"""
+Non-blocking logging using a bounded queue and a batching listener thread.
+
+`configure_nonblocking` moves the handlers of a logger behind a
+`BoundedQueueHandler`, so that logging calls only enqueue records. A
+`BatchingQueueListener` drains the queue in a background thread and writes
+each batch of records with a single call per handler, where possible.
+"""
+import atexit
+import logging
+import threading
+
+from . import utils
+from ._compat import queue
+
+
+__all__ = [
+    'BatchingQueueListener',
+    'BoundedQueueHandler',
+    'configure_nonblocking',
+]
+
+
+#: Overflow policy that blocks the logging call until the queue has space.
+BLOCK = 'block'
+#: Overflow policy that discards records that don't fit in the queue.
+DROP_NEW = 'drop_new'
+#: Overflow policy that discards the oldest queued record to make space.
+DROP_OLDEST = 'drop_oldest'
+
+OVERFLOW_POLICIES = (BLOCK, DROP_NEW, DROP_OLDEST)
+
+_SENTINEL = None
+
+
+class BoundedQueueHandler(logging.Handler):
+    """Handler that puts records on a bounded queue.
+
+    Records are queued as-is, so formatting happens in the listener thread.
+    Mutable message arguments that change after the logging call may be
+    rendered with their new value.
+
+    Attributes:
+        dropped: Number of records discarded because the queue was full.
+
+    Arguments:
+        queue: Queue receiving records. Should be bounded.
+        overflow: Policy when the queue is full: 'block', 'drop_new' or
+            'drop_oldest'.
+    """
+
+    def __init__(self, queue, overflow=DROP_NEW, level=logging.NOTSET):
+        if overflow not in OVERFLOW_POLICIES:
+            msg = "Unknown overflow policy {!r}. Expected one of: {}"
+            raise ValueError(msg.format(overflow, OVERFLOW_POLICIES))
+
+        super(BoundedQueueHandler, self).__init__(level=level)
+        self.queue = queue
+        self.overflow = overflow
+        self.dropped = 0
+
+    def prepare(self, record):
+        """Return record placed on the queue. Override to customize."""
+        return record
+
+    def emit(self, record):
+        try:
+            self.enqueue(self.prepare(record))
+        except Exception:
+            self.handleError(record)
+
+    def enqueue(self, record):
+        if self.overflow == BLOCK:
+            self.queue.put(record)
+            return
+
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            if self.overflow == DROP_OLDEST:
+                self._replace_oldest(record)
+            else:
+                self.dropped += 1
+
+    def _replace_oldest(self, record):
+        try:
+            self.queue.get_nowait()
+        except queue.Empty:
+            pass
+        self.dropped += 1
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class BatchingQueueListener(object):
+    """Listener thread that drains a queue and passes records to handlers.
+
+    Records are handled in batches of up to `batch_size` records. Batches are
+    written to `logging.StreamHandler` and `logging.FileHandler` with a single
+    `write` call. Other handlers receive records one at a time.
+
+    Arguments:
+        queue: Queue receiving records.
+        handlers: Handlers that records are passed to. Handler levels are
+            respected.
+        batch_size: Maximum number of records handled per batch.
+    """
+
+    def __init__(self, queue, handlers, batch_size=100):
+        self.queue = queue
+        self.handlers = list(handlers)
+        self.batch_size = batch_size
+        self._thread = None
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._monitor,
+                                        name='logquacious-listener')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        """Handle all queued records and stop the listener thread."""
+        if self._thread is None:
+            return
+        self.queue.put(_SENTINEL)
+        self._thread.join()
+        self._thread = None
+
+    def handle_batch(self, records):
+        for handler in self.handlers:
+            try:
+                _handle_batch(handler, records)
+            except Exception:
+                # A failing filter or handler mustn't stop the listener
+                # thread, or all later records would be dropped.
+                handler.handleError(records[0])
+
+    def _monitor(self):
+        while True:
+            batch = [self.queue.get()]
+            while len(batch) < self.batch_size and batch[-1] is not _SENTINEL:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            stop = batch[-1] is _SENTINEL
+            if stop:
+                batch.pop()
+            if batch:
+                self.handle_batch(batch)
+            if stop:
+                break
+
+
+def _handle_batch(handler, records):
+    """Filter records once and pass them to `handler`, like `Handler.handle`.
+
+    Since Python 3.12, filters may return a replacement record, which is then
+    handled instead of the original record.
+    """
+    accepted = []
+    for record in records:
+        if record.levelno < handler.level:
+            continue
+        result = handler.filter(record)
+        if not result:
+            continue
+        if isinstance(result, logging.LogRecord):
+            record = result
+        accepted.append(record)
+    if not accepted:
+        return
+    if type(handler) in (logging.StreamHandler, logging.FileHandler):
+        _write_batch(handler, accepted)
+        return
+    for record in accepted:
+        handler.acquire()
+        try:
+            handler.emit(record)
+        finally:
+            handler.release()
+
+
+def _write_batch(handler, records):
+    """Write records to stream of a `StreamHandler` with a single call."""
+    lines = []
+    for record in records:
+        try:
+            lines.append(handler.format(record) + handler.terminator)
+        except Exception:
+            handler.handleError(record)
+    if not lines:
+        return
+    text = ''.join(lines)
+
+    handler.acquire()
+    try:
+        if handler.stream is None:
+            # `FileHandler` opened with `delay=True`.
+            handler.stream = handler._open()
+        handler.stream.write(text)
+        handler.flush()
+    except Exception:
+        handler.handleError(records[0])
+    finally:
+        handler.release()
+
+
+def configure_nonblocking(logger=None, queue_size=10000, overflow=DROP_NEW,
+                          batch_size=100):
+    """Move handlers of logger behind a queue drained by a listener thread.
+
+    The listener is stopped, and all queued records are handled, at exit.
+
+    Arguments:
+        logger: Logger or logger name. Defaults to the root logger.
+        queue_size: Maximum number of queued records.
+        overflow: Policy when the queue is full: 'block', 'drop_new' or
+            'drop_oldest'.
+        batch_size: Maximum number of records written per batch.
+
+    Returns:
+        Started `BatchingQueueListener`. Call `stop` to handle all queued
+        records and stop the listener thread.
+    """
+    logger = utils.get_logger(logger)
+    record_queue = queue.Queue(maxsize=queue_size)
+    queue_handler = BoundedQueueHandler(record_queue, overflow=overflow)
+
+    handlers = list(logger.handlers)
+    for handler in handlers:
+        logger.removeHandler(handler)
+    logger.addHandler(queue_handler)
+
+    listener = BatchingQueueListener(record_queue, handlers,
+                                     batch_size=batch_size)
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
@@ -0,0 +1,139 @@
+"""
+Opt-in measurement of the time spent inside logquacious.
+
+Each `LogManager` has an `OverheadStats` instance (`log.overhead`) that
+accumulates the nanoseconds spent by its context managers and decorators,
+split by label and phase:
+
+- `template_lookup`: Resolving start/finish templates.
+- `argument_formatting`: Formatting function arguments and templates.
+- `record_creation`: Creating log records, including finding the caller.
+- `handler_dispatch`: Passing records to handlers.
+
+Measurement is disabled by default, in which case the only cost is a check of
+`OverheadStats.enabled`.
+"""
+import sys
+import threading
+
+from ._compat import perf_counter_ns
+from .backport_configurable_stacklevel import (
+    ConfigurableStacklevelLoggerMixin,
+)
+
+
+__all__ = ['OverheadStats', 'PHASES']
+
+
+TEMPLATE_LOOKUP = 'template_lookup'
+ARGUMENT_FORMATTING = 'argument_formatting'
+RECORD_CREATION = 'record_creation'
+HANDLER_DISPATCH = 'handler_dispatch'
+
+# Before Python 3.11, `findCaller` counts frames from `Logger.log` rather than
+# from the first frame outside of `logging`.
+_LEGACY_FIND_CALLER = sys.version_info < (3, 11)
+# Before Python 3.8, `findCaller` doesn't accept `stacklevel`.
+_BACKPORT_FIND_CALLER = sys.version_info < (3, 8)
+
+PHASES = (
+    TEMPLATE_LOOKUP,
+    ARGUMENT_FORMATTING,
+    RECORD_CREATION,
+    HANDLER_DISPATCH,
+)
+
+
+class OverheadStats(object):
+    """Nanoseconds spent inside logquacious, by label and phase.
+
+    >>> stats = OverheadStats(enabled=True)
+    >>> stats.add('label', TEMPLATE_LOOKUP, 100)
+    >>> stats.totals()[TEMPLATE_LOOKUP]
+    100
+    """
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self._by_label = {}
+        self._lock = threading.Lock()
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def reset(self):
+        with self._lock:
+            self._by_label = {}
+
+    def add(self, label, phase, nanoseconds):
+        with self._lock:
+            phases = self._by_label.get(label)
+            if phases is None:
+                phases = self._by_label[label] = dict.fromkeys(PHASES, 0)
+            phases[phase] += nanoseconds
+
+    def by_label(self):
+        """Return dict mapping labels to dicts of nanoseconds per phase."""
+        with self._lock:
+            return {label: dict(phases)
+                    for label, phases in self._by_label.items()}
+
+    def totals(self):
+        """Return dict mapping phases to nanoseconds summed over all labels."""
+        totals = dict.fromkeys(PHASES, 0)
+        for phases in self.by_label().values():
+            for phase, nanoseconds in phases.items():
+                totals[phase] += nanoseconds
+        return totals
+
+
+def timed_log(logger, level, msg, args, kwargs):
+    """Log message and return time spent creating and dispatching the record.
+
+    This does the same as `Logger.log`, but creates the record with
+    `findCaller` and `makeRecord` and passes it to `Logger.handle` itself, so
+    both steps are timed without patching the logger, which is shared by all
+    threads. Before Python 3.8, the backported `findCaller` is used to
+    support `stacklevel`.
+
+    Note that this function adds a level to the stack, so callers passing
+    `stacklevel` should account for it.
+
+    Returns:
+        Tuple of nanoseconds spent creating the record and dispatching it.
+    """
+    if not logger.isEnabledFor(level):
+        return 0, 0
+    start = perf_counter_ns()
+    stacklevel = kwargs.get('stacklevel', 1)
+    if _LEGACY_FIND_CALLER:
+        # `findCaller` expects to be called by `Logger._log`, which is called
+        # by `Logger.log`, so its frames are counted from two frames deeper.
+        stacklevel = max(stacklevel - 2, 1)
+    if _BACKPORT_FIND_CALLER:
+        find_caller = ConfigurableStacklevelLoggerMixin.__dict__['findCaller']
+        fn, lno, func, sinfo = find_caller(
+            logger, kwargs.get('stack_info', False), stacklevel,
+        )
+    else:
+        fn, lno, func, sinfo = logger.findCaller(
+            kwargs.get('stack_info', False), stacklevel,
+        )
+    exc_info = kwargs.get('exc_info')
+    if exc_info:
+        if isinstance(exc_info, BaseException):
+            exc_info = (type(exc_info), exc_info,
+                        getattr(exc_info, '__traceback__', None))
+        elif not isinstance(exc_info, tuple):
+            exc_info = sys.exc_info()
+    record_args = (logger.name, level, fn, lno, msg, args, exc_info, func,
+                   kwargs.get('extra'))
+    if sys.version_info.major >= 3:
+        record_args += (sinfo,)
+    record = logger.makeRecord(*record_args)
+    created = perf_counter_ns()
+    logger.handle(record)
+    return created - start, perf_counter_ns() - created
@@ -0,0 +1,102 @@
+"""
+Profiling of a sample of context manager and decorator invocations.
+
+`Profiler` follows the tracker interface of `logquacious.memory`: `start`
+returns state for `stop`, which returns a dict of template fields that are
+also added as attributes of the finish record.
+"""
+import cProfile
+import os
+import pstats
+import random
+import re
+import threading
+import time
+
+from ._compat import StringIO
+
+
+__all__ = ['Profiler', 'get_profiler']
+
+
+#: Record attribute and template field with the top profiled functions.
+PROFILE_STATS_ATTRIBUTE = 'profile_stats'
+#: Record attribute and template field with the path of the `.pstats` file.
+PROFILE_PATH_ATTRIBUTE = 'profile_path'
+
+_profiling = threading.local()
+
+
+class Profiler(object):
+    """Tracker running a sample of invocations under `cProfile`.
+
+    Only one invocation per thread is profiled at a time, so invocations
+    nested inside a profiled invocation aren't profiled separately.
+
+    Arguments:
+        rate: Fraction of invocations that are profiled.
+        top: Number of functions reported in `profile_stats`. If 0, the stats
+            aren't reported.
+        sort: Sort key for reported functions. See `pstats.Stats.sort_stats`.
+        directory: If given, stats are written to a `.pstats` file in this
+            directory, whose path is reported in `profile_path`.
+    """
+
+    def __init__(self, rate=1.0, top=20, sort='cumulative', directory=None):
+        self.rate = rate
+        self.top = top
+        self.sort = sort
+        self.directory = directory
+
+    def start(self, label):
+        if getattr(_profiling, 'active', False):
+            return None
+        if random.random() >= self.rate:
+            return None
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Another profiler is active (Python >= 3.12).
+            return None
+        _profiling.active = True
+        return label, profile
+
+    def stop(self, state):
+        if state is None:
+            return {}
+        label, profile = state
+        profile.disable()
+        _profiling.active = False
+
+        fields = {}
+        if self.top:
+            stream = StringIO()
+            stats = pstats.Stats(profile, stream=stream)
+            stats.sort_stats(self.sort).print_stats(self.top)
+            fields[PROFILE_STATS_ATTRIBUTE] = stream.getvalue()
+        if self.directory is not None:
+            path = os.path.join(self.directory, _pstats_filename(label))
+            profile.dump_stats(path)
+            fields[PROFILE_PATH_ATTRIBUTE] = path
+        return fields
+
+
+def _pstats_filename(label):
+    safe_label = re.sub(r'[^\w.-]+', '_', str(label))
+    return '{}-{}-{}.pstats'.format(safe_label, os.getpid(),
+                                    int(time.time() * 1e6))
+
+
+def get_profiler(profile):
+    """Return profiler for `profile` option.
+
+    Arguments:
+        profile: True to profile every invocation, the fraction of
+            invocations to profile, or a `Profiler` instance.
+    """
+    if isinstance(profile, Profiler):
+        return profile
+    if profile is True:
+        return Profiler()
+    return Profiler(rate=profile)
@@ -0,0 +1,55 @@
+"""
+Adaptive sampling for context managers and decorators.
+"""
+import random
+
+from ._compat import perf_counter
+
+
+__all__ = ['AdaptiveSampler']
+
+
+#: Record attribute holding the sample rate of sampled context records.
+SAMPLE_RATE_ATTRIBUTE = 'sample_rate'
+
+
+class AdaptiveSampler(object):
+    """Sampler keeping the number of logged calls under a budget.
+
+    The call rate is measured over windows of `window` seconds and the sample
+    rate for the next window is set so that the expected number of logged
+    calls per second stays under `budget`. The sample rate drops when traffic
+    increases and recovers when it falls.
+
+    Counting is not synchronized between threads, so rates are approximate.
+
+    Arguments:
+        budget: Maximum number of logged calls per second.
+        window: Number of seconds over which the call rate is measured.
+    """
+
+    def __init__(self, budget, window=1.0):
+        self.budget = budget
+        self.window = window
+        self.rate = 1.0
+        self._window_start = perf_counter()
+        self._count = 0
+
+    def sample(self):
+        """Return current sample rate if call should be logged, else None."""
+        now = perf_counter()
+        elapsed = now - self._window_start
+        if elapsed >= self.window:
+            calls_per_second = self._count / elapsed
+            if calls_per_second <= self.budget:
+                self.rate = 1.0
+            else:
+                self.rate = self.budget / calls_per_second
+            self._window_start = now
+            self._count = 0
+        self._count += 1
+
+        rate = self.rate
+        if rate >= 1.0 or random.random() < rate:
+            return rate
+        return None
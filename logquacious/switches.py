@@ -0,0 +1,125 @@
+"""
+Runtime switches for logging of decorated functions.
+
+`FunctionContextLogger` registers each decorated function with `FUNCTIONS`.
+Logging can then be turned on and off by name pattern while the program runs.
+A decorated function whose logging is off only checks a single attribute
+before calling the original function.
+
+Rules also apply to functions decorated later, e.g. in modules imported after
+the call, so logging can be turned off everywhere and turned on for specific
+functions::
+
+    disable_functions('*')
+    enable_functions('myapp.billing.*')
+"""
+import fnmatch
+import threading
+import weakref
+
+
+__all__ = ['FUNCTIONS', 'FunctionRegistry', 'disable_functions',
+           'enable_functions']
+
+
+class FunctionRegistry(object):
+    """Registry of decorated functions with runtime on/off rules.
+
+    Functions are matched by their full name, `module.qualname`. Rules are
+    applied in order, so later rules take precedence over earlier ones.
+    Entries are weakly referenced, so registration doesn't keep decorators of
+    discarded functions alive.
+    """
+
+    def __init__(self):
+        self._entries = weakref.WeakSet()
+        self._rules = []
+        self._lock = threading.Lock()
+
+    def register(self, entry):
+        """Register entry and set its `enabled` attribute from rules.
+
+        Arguments:
+            entry: Object with `full_name`, `log_level` and `enabled`
+                attributes, such as a `FunctionContextLogger`.
+        """
+        with self._lock:
+            self._entries.add(entry)
+            entry.enabled = self._is_enabled(entry)
+
+    def entries(self):
+        """Return list of `(full_name, log_level, enabled)` tuples."""
+        with self._lock:
+            entries = list(self._entries)
+        return sorted((entry.full_name, entry.log_level, entry.enabled)
+                      for entry in entries)
+
+    def enable(self, pattern='*', level=None):
+        """Turn on logging of functions matching pattern.
+
+        Arguments:
+            pattern: Glob pattern matched against `module.qualname`.
+            level: If given, only match functions logged at this level.
+
+        Returns:
+            Number of currently registered functions that matched.
+        """
+        return self._add_rule(pattern, level, True)
+
+    def disable(self, pattern='*', level=None):
+        """Turn off logging of functions matching pattern.
+
+        See `enable` for arguments.
+        """
+        return self._add_rule(pattern, level, False)
+
+    def reset(self):
+        """Remove all rules and turn on logging of all functions."""
+        with self._lock:
+            self._rules = []
+            for entry in self._entries:
+                entry.enabled = True
+
+    def _add_rule(self, pattern, level, enabled):
+        rule = (pattern, level, enabled)
+        with self._lock:
+            self._rules.append(rule)
+            matched = [entry for entry in self._entries
+                       if _matches(rule, entry)]
+            for entry in matched:
+                entry.enabled = enabled
+        return len(matched)
+
+    def _is_enabled(self, entry):
+        enabled = True
+        for rule in self._rules:
+            if _matches(rule, entry):
+                enabled = rule[2]
+        return enabled
+
+
+def _matches(rule, entry):
+    pattern, level, _ = rule
+    if level is not None and entry.log_level != level:
+        return False
+    return fnmatch.fnmatchcase(entry.full_name, pattern)
+
+
+#: Registry used by `FunctionContextLogger`.
+FUNCTIONS = FunctionRegistry()
+
+
+def enable_functions(pattern='*', level=None):
+    """Turn on logging of decorated functions matching pattern.
+
+    See `FunctionRegistry.enable`.
+    """
+    return FUNCTIONS.enable(pattern, level=level)
+
+
+def disable_functions(pattern='*', level=None):
+    """Turn off logging of decorated functions matching pattern.
+
+    See `FunctionRegistry.enable`.
+    """
+    return FUNCTIONS.disable(pattern, level=level)
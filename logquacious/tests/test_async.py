@@ -0,0 +1,86 @@
+import asyncio
+import logging
+
+import mock
+import pytest
+
+from logquacious import log_context
+
+
+class TestCoroutineFunctions:
+
+    def setup(self):
+        self.logger = mock.Mock(spec=logging.Logger)
+        self.context = log_context.LogContext(self.logger)
+
+    def test_finish_logged_after_await(self):
+        @self.context.info
+        async def function():
+            await asyncio.sleep(0)
+            assert self.logger.log.call_count == 1
+            return log_context.get_context_labels()
+
+        assert asyncio.run(function()) == ('function',)
+        self.logger.log.assert_has_calls([
+            mock.call(logging.INFO, 'Call `function()`', stacklevel=3),
+            mock.call(logging.INFO, 'Return from `function`', stacklevel=3),
+        ])
+
+    def test_async_methods_of_decorated_class(self):
+        @self.context.info
+        class Service(object):
+            async def run(self):
+                return 'result'
+
+        assert asyncio.run(Service().run()) == 'result'
+        assert self.logger.log.call_count == 2
+
+    def test_overlapping_tracemalloc_tracking(self):
+        @self.context.info(track_memory='tracemalloc')
+        async def function(delay):
+            await asyncio.sleep(delay)
+            return delay
+
+        async def main():
+            return await asyncio.gather(function(0), function(0.01))
+
+        assert asyncio.run(main()) == [0, 0.01]
+        assert self.logger.log.call_count == 4
+
+
+class TestGeneratorFunctions:
+
+    def setup(self):
+        self.logger = mock.Mock(spec=logging.Logger)
+        self.context = log_context.LogContext(self.logger)
+
+    def test_return_value_passed_to_yield_from(self):
+        @self.context.info
+        def generate():
+            yield 1
+            return 'done'
+
+        def delegate():
+            result = yield from generate()
+            return result
+
+        generator = delegate()
+        assert next(generator) == 1
+        with pytest.raises(StopIteration) as exc_info:
+            next(generator)
+        assert exc_info.value.value == 'done'
+        assert self.logger.log.call_count == 2
+
+    def test_thrown_exception_keeps_traceback(self):
+        @self.context.info
+        def generate():
+            yield 1
+
+        generator = generate()
+        next(generator)
+        try:
+            raise ValueError()
+        except ValueError as error:
+            with pytest.raises(ValueError) as exc_info:
+                generator.throw(error)
+        assert 'generate' in [entry.name for entry in exc_info.traceback]
@@ -4,17 +4,7 @@ from unittest import TestCase
 import pytest
 
 from logquacious.backport_configurable_stacklevel import PatchedLoggerMixin
-
-
-class RecordingHandler(logging.NullHandler):
-
-    def __init__(self, *args, **kwargs):
-        super(RecordingHandler, self).__init__(*args, **kwargs)
-        self.records = []
-
-    def handle(self, record):
-        """Keep track of all the emitted records."""
-        self.records.append(record)
+from utils import RecordingHandler
 
 
 class TestPatchedLoggerMixin:
@@ -0,0 +1,113 @@
+import logging
+
+import pytest
+
+from logquacious._compat import copy_context
+from logquacious.buffering import BUFFERING_FILTER, RecordBuffer
+from logquacious.log_context import LogContext
+from utils import RecordingHandler
+
+
+class TestRecordBuffer:
+
+    def setup(self):
+        self.logger = logging.Logger(name='test', level=logging.DEBUG)
+        self.recording = RecordingHandler()
+        self.logger.addHandler(self.recording)
+
+    @property
+    def messages(self):
+        return [record.getMessage() for record in self.recording.records]
+
+    def test_debug_records_dropped_on_success(self):
+        with RecordBuffer(self.logger):
+            self.logger.debug('debug')
+            self.logger.info('info')
+        assert self.messages == ['info']
+
+    def test_debug_records_flushed_on_error(self):
+        with pytest.raises(ValueError):
+            with RecordBuffer(self.logger):
+                self.logger.debug('debug')
+                self.logger.info('info')
+                raise ValueError()
+        assert self.messages == ['info', 'debug']
+
+    def test_records_not_buffered_outside_context(self):
+        with RecordBuffer(self.logger):
+            pass
+        self.logger.debug('debug')
+        assert self.messages == ['debug']
+
+    def test_buffered_once_for_multiple_handlers(self):
+        other = RecordingHandler()
+        self.logger.addHandler(other)
+        with pytest.raises(ValueError):
+            with RecordBuffer(self.logger):
+                self.logger.debug('debug')
+                raise ValueError()
+        assert self.messages == ['debug']
+        assert len(other.records) == 1
+
+    def test_capacity_keeps_latest_records(self):
+        with pytest.raises(ValueError):
+            with RecordBuffer(self.logger, capacity=2):
+                for i in range(3):
+                    self.logger.debug(str(i))
+                raise ValueError()
+        assert self.messages == ['1', '2']
+
+    def test_nested_buffer_defers_to_outer_buffer(self):
+        with RecordBuffer(self.logger):
+            with pytest.raises(ValueError):
+                with RecordBuffer(self.logger):
+                    self.logger.debug('debug')
+                    raise ValueError()
+            assert self.messages == []
+        assert self.messages == []
+
+    def test_records_pass_in_context_copied_before_exit(self):
+        with RecordBuffer(self.logger):
+            context = copy_context()
+        context.run(self.logger.debug, 'debug')
+        assert self.messages == ['debug']
+
+    def test_filter_removed_on_exit(self):
+        with RecordBuffer(self.logger):
+            assert BUFFERING_FILTER in self.recording.filters
+        assert BUFFERING_FILTER not in self.recording.filters
+
+    def test_filter_kept_until_concurrent_buffers_exit(self):
+        first, second = RecordBuffer(self.logger), RecordBuffer(self.logger)
+        first_context, second_context = copy_context(), copy_context()
+        first_context.run(first.__enter__)
+        second_context.run(second.__enter__)
+        first_context.run(first.__exit__, None, None, None)
+        assert BUFFERING_FILTER in self.recording.filters
+        second_context.run(self.logger.debug, 'debug')
+        second_context.run(second.__exit__, None, None, None)
+        assert BUFFERING_FILTER not in self.recording.filters
+        assert self.messages == []
+
+    def test_buffer_debug_context(self):
+        context = LogContext(self.logger)
+        with pytest.raises(ValueError):
+            with context.info('label', buffer_debug=True):
+                self.logger.debug('debug')
+                raise ValueError()
+        assert self.messages == ['Enter label', 'debug', 'Exit label']
+
+    def test_buffer_debug_decorator(self):
+        context = LogContext(self.logger)
+
+        @context.info(buffer_debug=True)
+        def function(fail):
+            self.logger.debug('debug')
+            if fail:
+                raise ValueError()
+
+        function(False)
+        assert self.messages == ['Call `function()`', 'Return from `function`']
+        with pytest.raises(ValueError):
+            function(True)
+        assert self.messages[-1] == 'debug'
@@ -0,0 +1,68 @@
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import mock
+
+from logquacious import executors
+from logquacious.log_context import LogContext, get_context_labels
+from utils import RecordingHandler
+
+
+class TestContextExecutor:
+
+    def setup(self):
+        self.context = LogContext(mock.Mock(spec=logging.Logger))
+        self.executor = executors.ContextExecutor(ThreadPoolExecutor(2))
+
+    def teardown(self):
+        self.executor.shutdown()
+
+    def test_submit_carries_context_labels(self):
+        with self.context.info('outer'):
+            future = self.executor.submit(get_context_labels)
+        assert future.result() == ('outer',)
+
+    def test_map_carries_context_labels(self):
+        with self.context.info('outer'):
+            results = list(self.executor.map(lambda _: get_context_labels(),
+                                             range(3)))
+        assert results == [('outer',)] * 3
+
+    def test_submit_outside_context(self):
+        assert self.executor.submit(get_context_labels).result() == ()
+
+    def test_work_logging_after_buffered_context_exits(self):
+        logger = logging.Logger('test', level=logging.DEBUG)
+        handler = RecordingHandler()
+        logger.addHandler(handler)
+        context = LogContext(logger)
+        exited = threading.Event()
+
+        def work():
+            exited.wait(1)
+            logger.debug('late')
+
+        with context.info('label', buffer_debug=True):
+            future = self.executor.submit(work)
+        exited.set()
+        future.result()
+        messages = [record.getMessage() for record in handler.records]
+        assert messages == ['Enter label', 'Exit label', 'late']
+
+
+def test_run_in_executor_carries_context_labels():
+    context = LogContext(mock.Mock(spec=logging.Logger))
+
+    async def main():
+        with context.info('outer'):
+            return await executors.run_in_executor(
+                asyncio.get_event_loop(), None, get_context_labels,
+            )
+
+    loop = asyncio.new_event_loop()
+    try:
+        assert loop.run_until_complete(main()) == ('outer',)
+    finally:
+        loop.close()
@@ -0,0 +1,177 @@
+import io
+import logging
+import os
+import signal
+
+import mock
+import pytest
+
+from logquacious.handlers import CoalescingHandler, FlightRecorderHandler
+from logquacious.log_manager import LogManager
+from utils import RecordingHandler
+
+
+class TestFlightRecorderHandler:
+
+    def setup(self):
+        self.target = RecordingHandler()
+        self.handler = FlightRecorderHandler(self.target, capacity=3)
+        self.logger = logging.Logger('test', level=logging.DEBUG)
+        self.logger.addHandler(self.handler)
+
+    @property
+    def messages(self):
+        return [record.getMessage() for record in self.target.records]
+
+    def test_records_held_until_dump(self):
+        self.logger.debug('Hello %s', 'world')
+        assert self.messages == []
+        self.handler.dump()
+        assert self.messages == ['Hello world']
+
+    def test_dump_keeps_latest_records(self):
+        for i in range(5):
+            self.logger.debug('%d', i)
+        self.handler.dump()
+        assert self.messages == ['2', '3', '4']
+
+    def test_dump_clears_records(self):
+        self.logger.debug('debug')
+        self.handler.dump()
+        self.handler.dump()
+        assert self.messages == ['debug']
+
+    def test_dumped_record_attributes(self):
+        self.logger.info('info')
+        self.handler.dump()
+        record, = self.target.records
+        assert record.levelno == logging.INFO
+        assert record.name == 'test'
+        assert record.funcName == 'test_dumped_record_attributes'
+
+    def test_dumped_record_extra_attributes(self):
+        log = LogManager(self.logger).bind(request_id=42)
+        log.info('info')
+        self.handler.dump()
+        assert self.target.records[0].request_id == 42
+
+    def test_error_triggers_dump(self):
+        self.logger.debug('debug')
+        self.logger.error('error')
+        assert self.messages == ['debug', 'error']
+
+    def test_dump_respects_target_level(self):
+        self.target.setLevel(logging.INFO)
+        self.logger.debug('debug')
+        self.logger.info('info')
+        self.handler.dump()
+        assert self.messages == ['info']
+
+    @pytest.mark.skipif(not hasattr(signal, 'SIGUSR1'),
+                        reason="Requires SIGUSR1")
+    def test_dump_on_signal(self):
+        original_handler = signal.getsignal(signal.SIGUSR1)
+        try:
+            self.handler.dump_on_signal(signal.SIGUSR1)
+            self.logger.debug('debug')
+            os.kill(os.getpid(), signal.SIGUSR1)
+        finally:
+            signal.signal(signal.SIGUSR1, original_handler)
+        assert self.messages == ['debug']
+
+    def test_log_manager_dump_flight_recorder(self):
+        log = LogManager(self.logger)
+        log.debug('debug')
+        log.dump_flight_recorder()
+        assert self.messages == ['debug']
+
+
+class TestCoalescingHandler:
+
+    def setup(self):
+        self.target = RecordingHandler()
+        self.handler = CoalescingHandler(self.target, window=10)
+        self.logger = logging.Logger('test', level=logging.DEBUG)
+        self.logger.addHandler(self.handler)
+
+    @property
+    def messages(self):
+        return [record.getMessage() for record in self.target.records]
+
+    def test_repeats_summarized_by_next_record(self):
+        for _ in range(3):
+            self.logger.info('Hello %s', 'world')
+        assert self.messages == ['Hello world']
+        self.logger.info('Bye')
+        assert self.messages == ['Hello world',
+                                 'Last message repeated 2 times', 'Bye']
+
+    def test_summary_record_attributes(self):
+        self.logger.warning('Hello')
+        self.logger.warning('Hello')
+        self.handler.flush()
+        summary = self.target.records[-1]
+        assert summary.repeat_count == 1
+        assert summary.levelno == logging.WARNING
+        assert summary.name == 'test'
+
+    def test_repeats_not_formatted(self):
+        self.handler.target = logging.StreamHandler(io.StringIO())
+        arg = mock.MagicMock()
+        arg.__str__.return_value = 'arg'
+        for _ in range(3):
+            self.logger.info('%s', arg)
+        self.handler.flush()
+        assert arg.__str__.call_count == 1
+
+    def test_records_differing_in_args_or_level_not_coalesced(self):
+        self.logger.info('%d', 1)
+        self.logger.info('%d', 2)
+        self.logger.debug('%d', 2)
+        assert self.messages == ['1', '2', '2']
+
+    def test_records_from_other_loggers_not_coalesced(self):
+        other = logging.Logger('other', level=logging.DEBUG)
+        other.addHandler(self.handler)
+        self.logger.info('Hello')
+        other.info('Hello')
+        assert self.messages == ['Hello', 'Hello']
+
+    def test_records_with_exceptions_not_coalesced(self):
+        for _ in range(2):
+            try:
+                raise ValueError()
+            except ValueError:
+                self.logger.exception('Error')
+        assert self.messages == ['Error', 'Error']
+
+    def test_repeat_after_window_starts_new_run(self):
+        self.handler.window = 0.5
+        for created in [0, 0.2, 0.4, 1.0]:
+            self.handler.handle(logging.makeLogRecord({
+                'msg': 'Hello', 'levelno': logging.INFO, 'created': created,
+            }))
+        assert self.messages == ['Hello', 'Last message repeated 2 times',
+                                 'Hello']
+
+    def test_flush_ends_run(self):
+        self.logger.info('Hello')
+        self.logger.info('Hello')
+        self.handler.flush()
+        self.logger.info('Hello')
+        assert self.messages == ['Hello', 'Last message repeated 1 times',
+                                 'Hello']
+
+    def test_close_emits_summary(self):
+        self.logger.info('Hello')
+        self.logger.info('Hello')
+        self.handler.close()
+        assert self.messages == ['Hello', 'Last message repeated 1 times']
+
+    def test_brace_style_messages_coalesced(self):
+        log = LogManager(self.logger, style='{')
+        for _ in range(3):
+            log.info('Hello {}', 'world')
+        self.handler.flush()
+        assert self.messages == ['Hello world',
+                                 'Last message repeated 2 times']
@@ -0,0 +1,100 @@
+import logging
+import sys
+import textwrap
+
+import pytest
+
+from logquacious import instrumentation
+from utils import RecordingHandler
+
+
+MODULE_SOURCE = textwrap.dedent('''
+    from os.path import join
+
+
+    def add(a, b):
+        return a + b
+
+
+    class Service(object):
+
+        def run(self):
+            return add(1, 2)
+''')
+
+
+@pytest.fixture
+def package(tmpdir, monkeypatch):
+    package_dir = tmpdir.mkdir('instrumented_pkg')
+    package_dir.join('__init__.py').write('')
+    package_dir.join('services.py').write(MODULE_SOURCE)
+    monkeypatch.syspath_prepend(str(tmpdir))
+
+    handler = RecordingHandler()
+    logger = logging.getLogger('instrumented_pkg')
+    logger.addHandler(handler)
+    logger.setLevel(logging.DEBUG)
+    yield handler
+
+    logger.removeHandler(handler)
+    for name in list(sys.modules):
+        if name.startswith('instrumented_pkg'):
+            del sys.modules[name]
+
+
+def messages(handler):
+    return [record.getMessage() for record in handler.records]
+
+
+class TestInstrument:
+
+    def test_module_instrumented_on_import(self, package):
+        with instrumentation.instrument('instrumented_pkg.*'):
+            from instrumented_pkg import services
+
+            assert services.Service().run() == 3
+
+        assert messages(package) == [
+            'Call `Service.run()`',
+            'Call `add()`',
+            'Return from `add`',
+            'Return from `Service.run`',
+        ]
+        assert package.records[0].name == 'instrumented_pkg.services'
+        assert package.records[0].levelno == logging.DEBUG
+
+    def test_imported_functions_not_wrapped(self, package):
+        with instrumentation.instrument('instrumented_pkg.*'):
+            from instrumented_pkg import services
+
+            assert services.join is __import__('os').path.join
+
+    def test_remove_restores_original_functions(self, package):
+        hook = instrumentation.instrument('instrumented_pkg.*', level='INFO')
+        from instrumented_pkg import services
+        original_add = services.add.__wrapped__
+        add = services.add
+
+        hook.remove()
+
+        assert services.add is original_add
+        assert services.Service().run() == 3
+        assert add(1, 1) == 2
+        assert messages(package) == []
+        assert hook._finder not in sys.meta_path
+
+    def test_already_imported_module_instrumented(self, package):
+        from instrumented_pkg import services
+
+        with instrumentation.instrument('instrumented_pkg.services'):
+            services.add(1, 2)
+
+        assert messages(package) == ['Call `add()`', 'Return from `add`']
+
+    def test_unmatched_module_not_instrumented(self, package):
+        with instrumentation.instrument('other_pkg.*'):
+            from instrumented_pkg import services
+
+            services.add(1, 2)
+
+        assert messages(package) == []
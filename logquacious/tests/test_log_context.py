@@ -1,13 +1,24 @@
+import inspect
 import logging
+import warnings
+
 import mock
 
 import pytest
 
-from logquacious import log_context
+from logquacious import _compat, log_context
+from utils import RecordingHandler
 
 
 logging.basicConfig()
 
+#: Generators delegate to `_generate` with `yield from` on Python 3.
+GENERATOR_STACKLEVEL = 3 if _compat.delegate_generator is None else 4
+
+
+def get_context_logger(decorated_func):
+    return inspect.getclosurevars(decorated_func).nonlocals['self']
+
 
 func_name_and_level_parameters = pytest.mark.parametrize('func_name, level', [
     ('debug', logging.DEBUG),
@@ -135,3 +146,511 @@ class TestLogContext:
             pass
 
         self.logger.log.assert_called_once_with(level, "Start", stacklevel=3)
+
+    @func_name_and_level_parameters
+    def test_slow_context_manager_logs_finish(self, func_name, level):
+        context_manager = getattr(self.context, func_name)
+
+        with mock.patch.object(log_context, 'perf_counter',
+                               side_effect=[0, 1]):
+            with context_manager('context label', slow_threshold=0.5):
+                pass
+
+        self.logger.log.assert_called_once_with(
+            level, 'Exit context label', stacklevel=3,
+        )
+
+    @func_name_and_level_parameters
+    def test_fast_context_manager_logs_nothing(self, func_name, level):
+        context_manager = getattr(self.context, func_name)
+
+        with mock.patch.object(log_context, 'perf_counter',
+                               side_effect=[0, 0.1]):
+            with context_manager('context label', slow_threshold=0.5):
+                pass
+
+        self.logger.log.assert_not_called()
+
+    def test_slow_decorator_passes_wall_time(self):
+        context = log_context.LogContext(self.logger, templates={
+            'function.finish': '{label} took {wall_time:.1f}s',
+        })
+
+        @context.info(slow_threshold=0.5)
+        def function():
+            pass
+
+        with mock.patch.object(log_context, 'perf_counter',
+                               side_effect=[0, 0.1, 0, 2, 2, 2]):
+            function()
+            self.logger.log.assert_not_called()
+            function()
+
+        self.logger.log.assert_called_once_with(
+            logging.INFO, 'function took 2.0s', stacklevel=3,
+        )
+
+    def test_fast_call_skips_invocation(self):
+        @self.context.info(slow_threshold=0.5)
+        def function():
+            pass
+
+        with mock.patch.object(log_context.FunctionContextLogger,
+                               'start_invocation') as start_invocation:
+            function()
+        start_invocation.assert_not_called()
+
+    def test_max_depth_logs_outer_recursive_call(self):
+        context = log_context.LogContext(self.logger, templates={
+            'function.start': 'Start {label}',
+            'function.finish': '{label} made {nested_calls} nested calls',
+        })
+
+        @context.info(max_depth=1)
+        def countdown(n):
+            if n:
+                countdown(n - 1)
+
+        countdown(3)
+
+        self.logger.log.assert_has_calls([
+            mock.call(logging.INFO, 'Start countdown', stacklevel=3),
+            mock.call(logging.INFO, 'countdown made 3 nested calls',
+                      stacklevel=3),
+        ])
+        assert self.logger.log.call_count == 2
+
+    def test_max_depth_must_be_positive(self):
+        with pytest.raises(ValueError):
+            @self.context.info(max_depth=0)
+            def function():
+                pass
+
+    def test_max_depth_shared_by_context_managers_with_label(self):
+        with self.context.info('label', max_depth=2):
+            with self.context.info('label', max_depth=2):
+                with self.context.info('label', max_depth=2):
+                    pass
+
+        assert self.logger.log.call_count == 4
+
+    def test_max_nesting_limits_mutual_recursion(self):
+        context = log_context.LogContext(self.logger, templates={
+            'function.start': 'Start {label}',
+            'function.finish': None,
+        })
+
+        @context.info(max_nesting=3)
+        def visit_node(n):
+            if n:
+                visit_children(n - 1)
+
+        @context.info(max_nesting=3)
+        def visit_children(n):
+            visit_node(n)
+
+        visit_node(3)
+
+        assert [c[0][1] for c in self.logger.log.call_args_list] == [
+            'Start visit_node', 'Start visit_children', 'Start visit_node',
+        ]
+
+    def test_max_nesting_counts_contexts_of_any_label(self):
+        with self.context.info('outer'):
+            with self.context.info('inner', max_nesting=1):
+                pass
+            with self.context.info('inner', max_nesting=2):
+                pass
+
+        messages = [c[0][1] for c in self.logger.log.call_args_list]
+        assert messages == [
+            'Enter outer', 'Enter inner', 'Exit inner', 'Exit outer',
+        ]
+
+    def test_max_nesting_must_be_positive(self):
+        with pytest.raises(ValueError):
+            self.context.info('label', max_nesting=0)
+
+    def test_shared_limits_of_dynamic_labels_are_bounded(self):
+        with mock.patch.object(log_context, 'MAX_SHARED_LABELS', 2):
+            for label in ['a', 'b', 'a', 'c']:
+                with self.context.info(label, max_depth=1):
+                    pass
+
+        shared_labels = [key[0] for key in self.context.info._shared]
+        assert shared_labels == ['a', 'c']
+
+    def test_finish_template_with_wall_and_cpu_time(self):
+        context = log_context.LogContext(self.logger, templates={
+            'context.start': None,
+            'context.finish': '{label}: {wall_time:.1f}s, {cpu_time:.1f}s',
+        })
+
+        with mock.patch.object(log_context, 'perf_counter',
+                               side_effect=[0, 3]), \
+                mock.patch.object(log_context, 'thread_time',
+                                  side_effect=[0, 1]):
+            with context.info('stage'):
+                pass
+
+        self.logger.log.assert_called_once_with(
+            logging.INFO, 'stage: 3.0s, 1.0s', stacklevel=3,
+        )
+
+    def test_timers_not_run_if_unused(self):
+        with mock.patch.object(log_context, 'perf_counter') as perf_counter, \
+                mock.patch.object(log_context, 'thread_time') as thread_time:
+            with self.context.info('stage'):
+                pass
+
+        perf_counter.assert_not_called()
+        thread_time.assert_not_called()
+
+    def test_timing_adds_record_attributes(self):
+        with mock.patch.object(log_context, 'perf_counter',
+                               side_effect=[0, 3]), \
+                mock.patch.object(log_context, 'thread_time',
+                                  side_effect=[0, 1]):
+            with self.context.info('stage', timing=True):
+                pass
+
+        self.logger.log.assert_has_calls([
+            mock.call(logging.INFO, 'Enter stage', stacklevel=3),
+            mock.call(logging.INFO, 'Exit stage', stacklevel=3,
+                      extra={'wall_time': 3, 'cpu_time': 1}),
+        ])
+
+    def test_track_memory_reports_tracker_fields(self):
+        tracker = mock.Mock()
+        tracker.stop.return_value = {'memory_delta': 1024}
+        context = log_context.LogContext(self.logger, templates={
+            'context.start': None,
+            'context.finish': '{label} grew by {memory_delta} bytes',
+        })
+
+        with context.info('stage', track_memory=tracker):
+            pass
+
+        tracker.start.assert_called_once_with('stage')
+        tracker.stop.assert_called_once_with(tracker.start.return_value)
+        self.logger.log.assert_called_once_with(
+            logging.INFO, 'stage grew by 1024 bytes', stacklevel=3,
+            extra={'memory_delta': 1024},
+        )
+
+    def test_track_memory_stops_tracker_of_fast_call(self):
+        tracker = mock.Mock()
+        tracker.stop.return_value = {'memory_delta': 1024}
+
+        with mock.patch.object(log_context, 'perf_counter',
+                               side_effect=[0, 0.1]):
+            with self.context.info('stage', slow_threshold=0.5,
+                                   track_memory=tracker):
+                pass
+
+        tracker.start.assert_called_once_with('stage')
+        tracker.stop.assert_called_once_with(tracker.start.return_value)
+        self.logger.log.assert_not_called()
+
+    def test_profile_adds_stats_to_finish_record(self):
+        @self.context.info(profile=True)
+        def function():
+            return sum(range(10))
+
+        function()
+
+        finish_call = self.logger.log.call_args
+        assert finish_call[0] == (logging.INFO, 'Return from `function`')
+        assert 'profile_stats' in finish_call[1]['extra']
+
+    def test_profile_false_disables_profiling(self):
+        function_logger = self.context.info(profile=False)
+        assert function_logger.trackers == ()
+
+    def test_generator_logs_start_on_first_next(self):
+        @self.context.info
+        def generate():
+            yield 1
+            yield 2
+
+        generator = generate()
+        self.logger.log.assert_not_called()
+
+        assert next(generator) == 1
+        self.logger.log.assert_called_once_with(
+            logging.INFO, 'Call `generate()`',
+            stacklevel=GENERATOR_STACKLEVEL,
+        )
+
+    def test_generator_logs_finish_on_exhaustion(self):
+        context = log_context.LogContext(self.logger, templates={
+            'function.finish': '{label} yielded {items} items',
+        })
+
+        @context.info
+        def generate():
+            yield 1
+            yield 2
+
+        with mock.patch.object(log_context, 'perf_counter',
+                               side_effect=[0, 1, 10, 12, 20, 23]):
+            assert list(generate()) == [1, 2]
+
+        self.logger.log.assert_called_with(
+            logging.INFO, 'generate yielded 2 items',
+            stacklevel=GENERATOR_STACKLEVEL,
+            extra={'items': 2, 'active_time': 6},
+        )
+
+    def test_generator_logs_finish_on_close(self):
+        @self.context.info
+        def generate():
+            while True:
+                yield 1
+
+        generator = generate()
+        next(generator)
+        next(generator)
+        generator.close()
+
+        finish_call = self.logger.log.call_args
+        assert finish_call[0] == (logging.INFO, 'Return from `generate`')
+        assert finish_call[1]['extra']['items'] == 2
+
+    def test_generator_records_point_at_consumer(self):
+        logger = logging.Logger('test', level=logging.INFO)
+        handler = RecordingHandler()
+        logger.addHandler(handler)
+
+        @log_context.LogContext(logger).info
+        def generate():
+            yield 1
+
+        generator = generate()
+        line = inspect.currentframe().f_lineno + 1
+        next(generator)
+        list(generator)
+
+        start, finish = handler.records
+        assert start.funcName == 'test_generator_records_point_at_consumer'
+        assert start.lineno == line
+        assert finish.funcName == start.funcName
+        assert finish.lineno == line + 1
+
+    def test_generator_send_and_throw(self):
+        @self.context.info
+        def echo():
+            value = None
+            while True:
+                try:
+                    value = yield value
+                except ValueError:
+                    value = 'error'
+
+        generator = echo()
+        next(generator)
+        assert generator.send('hello') == 'hello'
+        assert generator.throw(ValueError) == 'error'
+
+    def test_disabled_level_skips_formatting(self):
+        self.logger.isEnabledFor.return_value = False
+
+        with mock.patch.object(log_context.utils,
+                               'format_function_args') as format_args:
+            @self.context.debug(show_args=True)
+            def function(value):
+                return value
+
+            assert function(1) == 1
+        with self.context.debug('context label'):
+            pass
+
+        format_args.assert_not_called()
+        self.logger.log.assert_not_called()
+        self.logger.isEnabledFor.assert_called_with(logging.DEBUG)
+
+    def test_level_changes_apply_to_existing_decorators(self):
+        handler = RecordingHandler()
+        logger = logging.getLogger('test_level_changes')
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        context = log_context.LogContext(logger)
+
+        @context.debug
+        def function():
+            pass
+
+        function()
+        assert handler.records == []
+        logger.setLevel(logging.DEBUG)
+        function()
+        assert len(handler.records) == 2
+        logger.removeHandler(handler)
+
+
+class TestClassContextLogger:
+
+    def setup(self):
+        self.logger = mock.Mock(spec=logging.Logger)
+        self.context = log_context.LogContext(self.logger, templates={
+            'function.start': 'Enter {label}',
+            'function.finish': None,
+        })
+
+    def logged_messages(self):
+        return [c[0][1] for c in self.logger.log.call_args_list]
+
+    def test_wraps_public_methods(self):
+        @self.context.info
+        class Service(object):
+            def __init__(self):
+                self.value = 1
+
+            def run(self):
+                return self._helper()
+
+            def _helper(self):
+                return self.value
+
+        assert Service().run() == 1
+        assert self.logged_messages() == ['Enter Service.run']
+
+    def test_include_and_exclude_patterns(self):
+        @self.context.info(include=['get_*', '_load'], exclude='get_secret')
+        class Service(object):
+            def get_name(self):
+                return 'name'
+
+            def get_secret(self):
+                return 'secret'
+
+            def _load(self):
+                pass
+
+            def other(self):
+                pass
+
+        service = Service()
+        service.get_name()
+        service.get_secret()
+        service._load()
+        service.other()
+        assert self.logged_messages() == [
+            'Enter Service.get_name', 'Enter Service._load',
+        ]
+
+    def test_static_and_class_methods(self):
+        @self.context.info
+        class Service(object):
+            @staticmethod
+            def static(value):
+                return value
+
+            @classmethod
+            def create(cls):
+                return cls
+
+        assert Service.static(1) == 1
+        assert Service().create() is Service
+        assert self.logged_messages() == [
+            'Enter Service.static', 'Enter Service.create',
+        ]
+
+    def test_properties(self):
+        @self.context.info
+        class Service(object):
+            @property
+            def value(self):
+                """Value docstring."""
+                return self._value
+
+            @value.setter
+            def value(self, value):
+                self._value = value
+
+        service = Service()
+        service.value = 2
+        assert service.value == 2
+        assert Service.value.__doc__ == 'Value docstring.'
+        assert self.logged_messages() == [
+            'Enter Service.value', 'Enter Service.value',
+        ]
+
+    def test_method_loggers_share_templates_but_not_samplers(self):
+        function_logger = self.context.info(sample_budget=10, max_depth=1)
+        method_logger = function_logger.copy()
+
+        assert method_logger.start_template is function_logger.start_template
+        assert method_logger.sampler is not function_logger.sampler
+        assert method_logger.sampler.budget == 10
+        assert method_logger.depth_limit is not function_logger.depth_limit
+
+    def test_methods_share_class_logger_settings(self):
+        @self.context.info(sample_budget=10, max_depth=1)
+        class Service(object):
+            def run(self):
+                pass
+
+            def stop(self):
+                pass
+
+        run_logger = get_context_logger(Service.run)
+        stop_logger = get_context_logger(Service.stop)
+        assert (run_logger.label, stop_logger.label) == (
+            'Service.run', 'Service.stop',
+        )
+        assert run_logger.sampler is stop_logger.sampler
+        assert run_logger.depth_limit is stop_logger.depth_limit
+        assert 'sampler' not in vars(run_logger)
+
+    def test_shared_callables_not_bound_to_method_loggers(self):
+        context = log_context.LogContext(self.logger)
+
+        @context.info(show_args=True)
+        class Service(object):
+            def run(self, value):
+                return value
+
+        # Binding `functools.partial` warns on Python 3.13.
+        with warnings.catch_warnings():
+            warnings.simplefilter('error')
+            assert Service().run(1) == 1
+        start_msg = self.logger.log.call_args_list[0][0][1]
+        assert start_msg.startswith('Call `Service.run(<')
+        assert start_msg.endswith(', 1)`')
+
+        function_logger = context.info()
+        function_logger.callback = lambda: None
+        cls = log_context._shared_logger_class(function_logger)
+        method_logger = cls.__new__(cls)
+        assert method_logger.callback is function_logger.callback
+        assert not inspect.ismethod(method_logger._format_function_args)
+
+
+class TestGetContextLabels:
+
+    def setup(self):
+        self.context = log_context.LogContext(mock.Mock(spec=logging.Logger))
+
+    def test_no_open_contexts(self):
+        assert log_context.get_context_labels() == ()
+
+    def test_nested_contexts(self):
+        @self.context.debug
+        def function():
+            return log_context.get_context_labels()
+
+        with self.context.info('outer'):
+            assert function() == ('outer', 'function')
+            assert log_context.get_context_labels() == ('outer',)
+        assert log_context.get_context_labels() == ()
+
+    def test_disabled_levels_not_tracked(self):
+        self.context.logger.isEnabledFor.return_value = False
+
+        @self.context.debug
+        def function():
+            return log_context.get_context_labels()
+
+        with self.context.debug('outer'):
+            assert function() == ()
@@ -4,6 +4,7 @@ import mock
 import pytest
 
 from logquacious import log_manager
+from utils import RecordingHandler
 
 
 class TestLogManager:
@@ -93,3 +94,272 @@ class TestLogManager:
             with context_manager(KeyError):
                 raise ValueError('Not caught by log manager')
         self.logger.log.assert_not_called()
+
+    def test_nested_reraise_logs_exception_once(self):
+        with pytest.raises(ValueError):
+            with self.log.and_reraise(ValueError):
+                with self.log.and_reraise(ValueError):
+                    raise ValueError('Test error')
+
+        self.logger.log.assert_called_once_with(
+            logging.ERROR,
+            "Logging error and reraising",
+            exc_info=True,
+            stacklevel=3,
+        )
+
+    def test_nested_reraise_logs_propagated_msg(self):
+        with pytest.raises(ValueError):
+            with self.log.and_reraise(ValueError, propagated_msg='Propagated'):
+                with self.log.and_reraise(ValueError):
+                    raise ValueError('Test error')
+
+        self.logger.log.assert_has_calls([
+            mock.call(logging.ERROR, "Logging error and reraising",
+                      exc_info=True, stacklevel=3),
+            mock.call(logging.ERROR, "Propagated", stacklevel=3),
+        ])
+
+    def test_nested_reraise_at_disabled_level_logged_by_outer(self):
+        self.logger.isEnabledFor.side_effect = lambda level: (
+            level >= logging.INFO)
+        with pytest.raises(KeyError):
+            with self.log.and_reraise(KeyError):
+                with self.log.and_reraise(KeyError, level=logging.DEBUG):
+                    raise KeyError('Test error')
+
+        self.logger.log.assert_called_with(
+            logging.ERROR,
+            "Logging error and reraising",
+            exc_info=True,
+            stacklevel=3,
+        )
+
+    def test_suppress_each_skips_failed_items(self):
+        results = self.log.suppress_each(['1', 'x', '3'], ValueError,
+                                         func=int)
+
+        assert list(results) == [1, 3]
+        assert (results.processed, results.failed) == (3, 1)
+        self.logger.log.assert_has_calls([
+            mock.call(logging.ERROR, "Suppressed error for item and logging",
+                      exc_info=True, stacklevel=3),
+            mock.call(logging.INFO, "Processed 3 items with 1 failures",
+                      extra={'processed': 3, 'failed': 1}, stacklevel=3),
+        ])
+
+    def test_suppress_each_is_lazy(self):
+        consumed = []
+
+        def items():
+            for i in range(3):
+                consumed.append(i)
+                yield i
+
+        results = iter(self.log.suppress_each(items(), ValueError))
+        assert next(results) == 0
+        assert consumed == [0]
+
+    def test_suppress_each_does_not_catch_other_exceptions(self):
+        results = self.log.suppress_each(['1', None], ValueError, func=int)
+
+        with pytest.raises(TypeError):
+            list(results)
+
+    def test_suppress_each_limits_logged_exceptions(self):
+        results = self.log.suppress_each('xxxx', ValueError, func=int,
+                                         max_logged=2, summary_msg=None)
+
+        with mock.patch.object(log_manager, 'perf_counter', return_value=0):
+            assert list(results) == []
+
+        assert results.failed == 4
+        assert self.logger.log.call_count == 2
+
+
+class TestLazyLogging:
+
+    def setup(self):
+        self.handler = RecordingHandler()
+        self.logger = logging.getLogger('test_lazy_logging')
+        self.logger.addHandler(self.handler)
+        self.logger.setLevel(logging.INFO)
+        # Root handlers would format records.
+        self.logger.propagate = False
+        self.log = log_manager.LogManager(self.logger)
+        self.func = mock.Mock(return_value='value')
+
+    def teardown(self):
+        self.logger.removeHandler(self.handler)
+
+    def test_callable_not_called_for_disabled_level(self):
+        self.log.debug_lazy('Value: %s', self.func)
+        self.log.debug_lazy(self.func)
+
+        self.func.assert_not_called()
+        assert self.handler.records == []
+
+    def test_callable_not_called_until_formatted(self):
+        self.log.info_lazy('Value: %s', self.func)
+        self.func.assert_not_called()
+
+        record, = self.handler.records
+        assert record.getMessage() == 'Value: value'
+        assert record.getMessage() == 'Value: value'
+        self.func.assert_called_once_with()
+
+    def test_lazy_message(self):
+        self.log.log_lazy(logging.WARNING, self.func)
+
+        record, = self.handler.records
+        assert record.getMessage() == 'value'
+        assert record.levelno == logging.WARNING
+
+    def test_records_caller_location(self):
+        self.log.error_lazy('Error')
+
+        record, = self.handler.records
+        assert record.funcName == 'test_records_caller_location'
+
+
+class TestBraceStyle:
+
+    def setup(self):
+        self.handler = RecordingHandler()
+        self.logger = logging.getLogger('test_brace_style')
+        self.logger.addHandler(self.handler)
+        self.logger.setLevel(logging.INFO)
+        self.logger.propagate = False
+        self.log = log_manager.LogManager(self.logger, style='{')
+
+    def teardown(self):
+        self.logger.removeHandler(self.handler)
+
+    def test_message_formatted_with_fields(self):
+        self.log.info('user {user} took {ms:.1f}ms', user='tony', ms=12.34)
+
+        record, = self.handler.records
+        assert record.getMessage() == 'user tony took 12.3ms'
+        assert record.levelno == logging.INFO
+        assert record.funcName == 'test_message_formatted_with_fields'
+
+    def test_fields_are_record_attributes(self):
+        self.log.warning('{}: {user}', 'login', user='tony',
+                         extra={'request_id': 1})
+
+        record, = self.handler.records
+        assert record.getMessage() == 'login: tony'
+        assert record.user == 'tony'
+        assert record.request_id == 1
+
+    def test_reserved_fields_only_used_for_message(self):
+        self.log.error('Logger {name}', name='custom')
+
+        record, = self.handler.records
+        assert record.getMessage() == 'Logger custom'
+        assert record.name == 'test_brace_style'
+
+    def test_exception(self):
+        try:
+            raise ValueError('Test error')
+        except ValueError:
+            self.log.exception('Failed {task}', task='job')
+
+        record, = self.handler.records
+        assert record.exc_info[0] is ValueError
+
+    def test_message_not_created_for_disabled_level(self):
+        with mock.patch.object(log_manager.utils, 'BraceMessage') as message:
+            self.log.debug('{field}', field='value')
+
+        message.assert_not_called()
+        assert self.handler.records == []
+
+    def test_suppressed_error_location(self):
+        with self.log.and_suppress(ValueError):
+            raise ValueError('Test error')
+
+        record, = self.handler.records
+        assert record.funcName == 'test_suppressed_error_location'
+
+    def test_unknown_style(self):
+        with pytest.raises(ValueError):
+            log_manager.LogManager(self.logger, style='$')
+
+
+class TestBind:
+
+    def setup(self):
+        self.handler = RecordingHandler()
+        self.logger = logging.getLogger('test_bind')
+        self.logger.addHandler(self.handler)
+        self.logger.setLevel(logging.DEBUG)
+        self.logger.propagate = False
+        self.log = log_manager.LogManager(self.logger)
+
+    def teardown(self):
+        self.logger.removeHandler(self.handler)
+
+    def test_records_have_bound_fields(self):
+        child = self.log.bind(request_id=1)
+        child.info('Message %s', 'arg', extra={'tenant': 'a'})
+
+        record, = self.handler.records
+        assert record.getMessage() == 'Message arg'
+        assert (record.request_id, record.tenant) == (1, 'a')
+        assert record.funcName == 'test_records_have_bound_fields'
+
+    def test_parent_unchanged(self):
+        self.log.bind(request_id=1)
+        self.log.info('Message')
+
+        record, = self.handler.records
+        assert not hasattr(record, 'request_id')
+
+    def test_nested_bind(self):
+        child = self.log.bind(request_id=1, tenant='a').bind(tenant='b')
+        child.warning('Message')
+
+        record, = self.handler.records
+        assert (record.request_id, record.tenant) == (1, 'b')
+
+    def test_extra_shared_between_calls(self):
+        child = self.log.bind(request_id=1)
+        with mock.patch.object(self.logger, 'log') as log:
+            child.info('First')
+            child.info('Second')
+
+        first, second = log.call_args_list
+        assert first[1]['extra'] is second[1]['extra'] is child.extra
+
+    def test_context_records_have_bound_fields(self):
+        child = self.log.bind(request_id=1)
+
+        @child.context.debug
+        def function():
+            pass
+
+        function()
+        with child.context.info('label'):
+            pass
+
+        assert len(self.handler.records) == 4
+        assert all(r.request_id == 1 for r in self.handler.records)
+        assert child.context.info.templates is self.log.context.info.templates
+
+    def test_suppressed_error_has_bound_fields(self):
+        child = self.log.bind(request_id=1)
+        with child.and_suppress(ValueError):
+            raise ValueError('Test error')
+
+        record, = self.handler.records
+        assert record.request_id == 1
+        assert record.funcName == 'test_suppressed_error_has_bound_fields'
+
+    def test_brace_style(self):
+        log = log_manager.LogManager(self.logger, style='{')
+        log.bind(request_id=1).info('{user}', user='tony')
+
+        record, = self.handler.records
+        assert record.getMessage() == 'tony'
+        assert (record.request_id, record.user) == (1, 'tony')
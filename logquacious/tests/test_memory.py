@@ -0,0 +1,92 @@
+import tracemalloc
+
+import mock
+import pytest
+
+from logquacious import memory
+
+
+class TestRssTracker:
+
+    def test_reports_growth_of_peak_rss(self):
+        tracker = memory.RssTracker()
+        usage = mock.Mock()
+        with mock.patch.object(memory.resource, 'getrusage',
+                               return_value=usage):
+            usage.ru_maxrss = 100
+            state = tracker.start('label')
+            usage.ru_maxrss = 150
+            fields = tracker.stop(state)
+
+        assert fields == {'memory_delta': 50 * memory._MAXRSS_SCALE}
+
+
+class TestTracemallocTracker:
+
+    def test_reports_growth_and_top_allocation_sites(self):
+        tracker = memory.TracemallocTracker(top=3)
+
+        state = tracker.start('label')
+        data = [bytearray(1000) for _ in range(100)]
+        fields = tracker.stop(state)
+
+        assert fields['memory_delta'] >= 100 * 1000
+        assert len(fields['memory_top']) == 3
+        assert __file__ in fields['memory_top'][0]
+        del data
+
+    def test_stops_tracing_it_started(self):
+        tracker = memory.TracemallocTracker(top=0)
+
+        outer = tracker.start('label')
+        inner = tracker.start('label')
+        tracker.stop(inner)
+        assert tracemalloc.is_tracing()
+        fields = tracker.stop(outer)
+
+        assert not tracemalloc.is_tracing()
+        assert 'memory_top' not in fields
+
+    def test_overlapping_invocations_keep_tracing(self):
+        tracker = memory.TracemallocTracker(top=0)
+
+        first = tracker.start('first')
+        second = tracker.start('second')
+        tracker.stop(first)
+        assert tracemalloc.is_tracing()
+        tracker.stop(second)
+
+        assert not tracemalloc.is_tracing()
+
+    def test_does_not_stop_tracing_started_elsewhere(self):
+        tracemalloc.start()
+        try:
+            tracker = memory.TracemallocTracker(top=0)
+            tracker.stop(tracker.start('label'))
+            assert tracemalloc.is_tracing()
+        finally:
+            tracemalloc.stop()
+
+
+class TestGetMemoryTracker:
+
+    def test_tracker_names(self):
+        assert isinstance(memory.get_memory_tracker('rss'),
+                          memory.RssTracker)
+        assert isinstance(memory.get_memory_tracker('tracemalloc'),
+                          memory.TracemallocTracker)
+
+    def test_tracker_instance(self):
+        tracker = memory.TracemallocTracker(top=1)
+        assert memory.get_memory_tracker(tracker) is tracker
+
+    def test_true_is_rss(self):
+        assert isinstance(memory.get_memory_tracker(True), memory.RssTracker)
+
+    def test_invalid_tracker(self):
+        with pytest.raises(ValueError):
+            memory.get_memory_tracker(1)
+
+    def test_unknown_tracker(self):
+        with pytest.raises(ValueError):
+            memory.get_memory_tracker('heap')
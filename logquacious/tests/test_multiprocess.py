@@ -0,0 +1,81 @@
+import logging
+import multiprocessing
+import sys
+
+import pytest
+
+from logquacious import multiprocess
+from logquacious._compat import queue
+from logquacious.multiprocess import ProcessLogAggregator, WorkerQueueHandler
+from utils import RecordingHandler
+
+
+def make_record(msg, level=logging.INFO):
+    return logging.makeLogRecord({'msg': msg, 'levelno': level})
+
+
+def log_from_worker(value):
+    logging.getLogger('worker').warning('value=%s', value)
+    return value
+
+
+class TestCompactRecord:
+
+    def test_message_is_rendered(self):
+        record = logging.makeLogRecord({'msg': 'x=%s', 'args': (1,)})
+        restored = multiprocess.restore_record(
+            multiprocess.compact_record(record)
+        )
+        assert restored.msg == 'x=1'
+        assert restored.getMessage() == 'x=1'
+
+    def test_exception_sent_as_text(self):
+        try:
+            raise ValueError('Test error')
+        except ValueError:
+            record = logging.makeLogRecord({'msg': 'error',
+                                            'exc_info': sys.exc_info()})
+        restored = multiprocess.restore_record(
+            multiprocess.compact_record(record)
+        )
+        assert restored.exc_info is None
+        assert 'ValueError: Test error' in restored.exc_text
+
+    def test_extra_attributes_sent(self):
+        record = logging.makeLogRecord({'msg': 'x', 'request_id': 42,
+                                        'callback': lambda: None})
+        restored = multiprocess.restore_record(
+            multiprocess.compact_record(record)
+        )
+        assert restored.request_id == 42
+        assert restored.callback.startswith('<function')
+
+
+class TestWorkerQueueHandler:
+
+    def setup(self):
+        self.queue = queue.Queue()
+        self.handler = WorkerQueueHandler(self.queue)
+
+    def test_records_sent_when_handled(self):
+        for msg in 'ab':
+            self.handler.handle(make_record(msg))
+        messages = [multiprocess.restore_record(self.queue.get_nowait()).msg
+                    for _ in range(2)]
+        assert messages == ['a', 'b']
+        assert self.queue.empty()
+
+
+@pytest.mark.skipif(sys.platform == 'win32', reason="Slow process startup")
+def test_pool_records_aggregated_in_parent():
+    recording = RecordingHandler()
+    aggregator = ProcessLogAggregator(handlers=[recording],
+                                      level=logging.INFO)
+    with aggregator:
+        # Leaving the block terminates workers without waiting for them.
+        with multiprocessing.Pool(2, initializer=aggregator.initializer,
+                                  initargs=aggregator.initargs) as pool:
+            assert pool.map(log_from_worker, range(4)) == list(range(4))
+
+    messages = sorted(record.getMessage() for record in recording.records)
+    assert messages == ['value=0', 'value=1', 'value=2', 'value=3']
@@ -0,0 +1,156 @@
+import io
+import logging
+import sys
+import threading
+
+import mock
+import pytest
+
+from logquacious import nonblocking
+from logquacious._compat import queue
+from logquacious.nonblocking import (
+    BatchingQueueListener, BoundedQueueHandler, configure_nonblocking,
+)
+from utils import RecordingHandler
+
+
+def make_record(msg, level=logging.INFO):
+    return logging.makeLogRecord({'msg': msg, 'levelno': level})
+
+
+class TestBoundedQueueHandler:
+
+    def setup(self):
+        self.queue = queue.Queue(maxsize=2)
+
+    def queued_messages(self):
+        messages = []
+        while not self.queue.empty():
+            messages.append(self.queue.get_nowait().msg)
+        return messages
+
+    def test_unknown_overflow_policy(self):
+        with pytest.raises(ValueError):
+            BoundedQueueHandler(self.queue, overflow='explode')
+
+    def test_drop_new(self):
+        handler = BoundedQueueHandler(self.queue, overflow='drop_new')
+        for msg in 'abc':
+            handler.handle(make_record(msg))
+        assert self.queued_messages() == ['a', 'b']
+        assert handler.dropped == 1
+
+    def test_drop_oldest(self):
+        handler = BoundedQueueHandler(self.queue, overflow='drop_oldest')
+        for msg in 'abc':
+            handler.handle(make_record(msg))
+        assert self.queued_messages() == ['b', 'c']
+        assert handler.dropped == 1
+
+    def test_block(self):
+        handler = BoundedQueueHandler(self.queue, overflow='block')
+        with mock.patch.object(self.queue, 'put') as mock_put:
+            handler.handle(make_record('a'))
+        mock_put.assert_called_once_with(mock.ANY)
+
+
+class TestBatchingQueueListener:
+
+    def setup(self):
+        self.queue = queue.Queue()
+        self.stream = io.StringIO()
+        self.stream_handler = logging.StreamHandler(self.stream)
+        self.recording = RecordingHandler()
+        self.listener = BatchingQueueListener(
+            self.queue, [self.stream_handler, self.recording], batch_size=10,
+        )
+
+    def test_records_handled_after_stop(self):
+        self.listener.start()
+        for msg in 'abc':
+            self.queue.put(make_record(msg))
+        self.listener.stop()
+
+        assert self.stream.getvalue() == 'a\nb\nc\n'
+        assert [r.msg for r in self.recording.records] == ['a', 'b', 'c']
+
+    def test_batch_written_with_single_call(self):
+        records = [make_record(msg) for msg in 'abc']
+        with mock.patch.object(self.stream, 'write') as mock_write:
+            self.listener.handle_batch(records)
+        mock_write.assert_called_once_with('a\nb\nc\n')
+
+    def test_handler_level_respected(self):
+        self.recording.setLevel(logging.WARNING)
+        self.listener.handle_batch([make_record('info'),
+                                    make_record('warn', logging.WARNING)])
+        assert [r.msg for r in self.recording.records] == ['warn']
+
+    def test_unformattable_record_only_skips_that_record(self):
+        bad = logging.makeLogRecord({'msg': 'bad %d', 'args': ('x',),
+                                     'levelno': logging.INFO})
+        with mock.patch.object(self.stream_handler,
+                               'handleError') as handle_error:
+            self.listener.handle_batch([make_record('a'), bad,
+                                        make_record('c')])
+        handle_error.assert_called_once_with(bad)
+        assert self.stream.getvalue() == 'a\nc\n'
+
+    def test_failing_filter_does_not_stop_listener(self):
+        failed = threading.Event()
+
+        def fail_once(record):
+            if not failed.is_set():
+                failed.set()
+                raise RuntimeError()
+            return True
+
+        self.recording.addFilter(fail_once)
+        with mock.patch.object(self.recording, 'handleError'):
+            self.listener.start()
+            self.queue.put(make_record('a'))
+            failed.wait(1)
+            self.queue.put(make_record('b'))
+            self.listener.stop()
+        assert [r.msg for r in self.recording.records] == ['b']
+
+    def test_filters_run_once_per_record(self):
+        calls = []
+
+        def count_calls(record):
+            calls.append(record.msg)
+            return True
+
+        self.stream_handler.addFilter(count_calls)
+        self.recording.addFilter(count_calls)
+        self.listener.handle_batch([make_record('a')])
+        assert calls == ['a', 'a']
+        assert self.stream.getvalue() == 'a\n'
+        assert [r.msg for r in self.recording.records] == ['a']
+
+    @pytest.mark.skipif(sys.version_info < (3, 12),
+                        reason="Filters return records since Python 3.12")
+    def test_record_returned_by_filter_is_handled(self):
+        def replace(record):
+            return make_record(record.msg.upper())
+
+        self.stream_handler.addFilter(replace)
+        self.recording.addFilter(replace)
+        self.listener.handle_batch([make_record('a')])
+        assert self.stream.getvalue() == 'A\n'
+        assert [r.msg for r in self.recording.records] == ['A']
+
+
+def test_configure_nonblocking():
+    logger = logging.Logger('test')
+    recording = RecordingHandler()
+    logger.addHandler(recording)
+
+    with mock.patch.object(nonblocking, 'atexit'):
+        listener = configure_nonblocking(logger, queue_size=10)
+    handler, = logger.handlers
+    assert isinstance(handler, BoundedQueueHandler)
+
+    logger.warning('warning')
+    listener.stop()
+    assert [r.msg for r in recording.records] == ['warning']
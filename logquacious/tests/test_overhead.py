@@ -0,0 +1,96 @@
+import logging
+import threading
+
+from logquacious import overhead
+from logquacious.log_manager import LogManager
+from logquacious.overhead import OverheadStats
+from utils import RecordingHandler
+
+
+class TestOverheadStats:
+
+    def setup(self):
+        self.stats = OverheadStats(enabled=True)
+
+    def test_add_by_label(self):
+        self.stats.add('a', overhead.TEMPLATE_LOOKUP, 1)
+        self.stats.add('a', overhead.TEMPLATE_LOOKUP, 2)
+        self.stats.add('b', overhead.HANDLER_DISPATCH, 3)
+        by_label = self.stats.by_label()
+        assert by_label['a'][overhead.TEMPLATE_LOOKUP] == 3
+        assert by_label['b'][overhead.HANDLER_DISPATCH] == 3
+
+    def test_totals(self):
+        self.stats.add('a', overhead.RECORD_CREATION, 1)
+        self.stats.add('b', overhead.RECORD_CREATION, 2)
+        assert self.stats.totals() == {
+            overhead.TEMPLATE_LOOKUP: 0,
+            overhead.ARGUMENT_FORMATTING: 0,
+            overhead.RECORD_CREATION: 3,
+            overhead.HANDLER_DISPATCH: 0,
+        }
+
+    def test_reset(self):
+        self.stats.add('a', overhead.RECORD_CREATION, 1)
+        self.stats.reset()
+        assert self.stats.by_label() == {}
+
+
+class TestLogManagerOverhead:
+
+    def setup(self):
+        self.logger = logging.Logger('test', level=logging.DEBUG)
+        self.recording = RecordingHandler()
+        self.logger.addHandler(self.recording)
+        self.log = LogManager(self.logger)
+
+    def test_disabled_by_default(self):
+        with self.log.context.info('label'):
+            pass
+        assert self.log.overhead.by_label() == {}
+
+    def test_context_manager_phases(self):
+        self.log.overhead.enable()
+        with self.log.context.info('label'):
+            pass
+        phases = self.log.overhead.by_label()['label']
+        assert all(phases[phase] > 0 for phase in overhead.PHASES)
+
+    def test_decorator_phases(self):
+        self.log.overhead.enable()
+
+        @self.log.context.info(show_args=True)
+        def function(a):
+            pass
+
+        function(1)
+        phases = self.log.overhead.by_label()['function']
+        assert all(phases[phase] > 0 for phase in overhead.PHASES)
+
+    def test_enabled_stats_keep_caller(self):
+        self.log.overhead.enable()
+        with self.log.context.info('label'):
+            pass
+        funcs = [record.funcName for record in self.recording.records]
+        assert funcs == ['test_enabled_stats_keep_caller'] * 2
+
+    def test_enabled_stats_thread_safe(self):
+        self.log.overhead.enable()
+        errors = []
+
+        def log_contexts():
+            try:
+                for _ in range(500):
+                    with self.log.context.info('label'):
+                        pass
+            except Exception as error:
+                errors.append(error)
+
+        threads = [threading.Thread(target=log_contexts) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert errors == []
+        assert len(self.recording.records) == 4 * 500 * 2
+        assert type(self.logger) is logging.Logger
@@ -0,0 +1,58 @@
+import os
+
+import mock
+
+from logquacious import profiling
+from logquacious.profiling import Profiler
+
+
+def busy_function():
+    return sum(range(1000))
+
+
+def profile_call(profiler, func, label='label'):
+    state = profiler.start(label)
+    func()
+    return profiler.stop(state)
+
+
+class TestProfiler:
+
+    def test_reports_top_functions(self):
+        fields = profile_call(Profiler(top=5), busy_function)
+        assert 'busy_function' in fields['profile_stats']
+
+    def test_unsampled_call_not_profiled(self):
+        profiler = Profiler(rate=0.1)
+        with mock.patch.object(profiling.random, 'random', return_value=0.5):
+            assert profile_call(profiler, busy_function) == {}
+
+    def test_nested_call_not_profiled(self):
+        profiler = Profiler()
+        state = profiler.start('outer')
+        assert profile_call(profiler, busy_function) == {}
+        assert 'profile_stats' in profiler.stop(state)
+
+    def test_writes_pstats_file(self, tmpdir):
+        profiler = Profiler(top=0, directory=str(tmpdir))
+
+        fields = profile_call(profiler, busy_function, label='my label')
+
+        assert 'profile_stats' not in fields
+        path = fields['profile_path']
+        assert os.path.dirname(path) == str(tmpdir)
+        assert os.path.basename(path).startswith('my_label-')
+        assert os.path.exists(path)
+
+
+class TestGetProfiler:
+
+    def test_true_profiles_every_call(self):
+        assert profiling.get_profiler(True).rate == 1.0
+
+    def test_rate(self):
+        assert profiling.get_profiler(0.01).rate == 0.01
+
+    def test_profiler_instance(self):
+        profiler = Profiler(top=1)
+        assert profiling.get_profiler(profiler) is profiler
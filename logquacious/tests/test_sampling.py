@@ -0,0 +1,71 @@
+import logging
+
+import mock
+
+from logquacious import sampling
+from logquacious.log_context import LogContext
+from logquacious.sampling import AdaptiveSampler
+
+
+def sample_at(sampler, time, random_value=0.5):
+    with mock.patch.object(sampling, 'perf_counter', return_value=time), \
+            mock.patch.object(sampling.random, 'random',
+                              return_value=random_value):
+        return sampler.sample()
+
+
+class TestAdaptiveSampler:
+
+    def setup(self):
+        with mock.patch.object(sampling, 'perf_counter', return_value=0):
+            self.sampler = AdaptiveSampler(budget=10)
+
+    def test_calls_under_budget_are_logged(self):
+        for i in range(5):
+            assert sample_at(self.sampler, 1.0 + i * 0.1) == 1.0
+
+    def test_rate_drops_under_load(self):
+        for _ in range(100):
+            sample_at(self.sampler, 0.5)
+        assert sample_at(self.sampler, 1.0, random_value=0.05) == 0.1
+        assert sample_at(self.sampler, 1.0, random_value=0.2) is None
+
+    def test_rate_recovers_when_traffic_falls(self):
+        for _ in range(100):
+            sample_at(self.sampler, 0.5)
+        sample_at(self.sampler, 1.0)
+        assert sample_at(self.sampler, 2.5) == 1.0
+
+
+class TestSampledContext:
+
+    def setup(self):
+        self.logger = mock.Mock(spec=logging.Logger)
+        self.context = LogContext(self.logger)
+
+    def test_sampled_records_have_sample_rate(self):
+        with self.context.info('label', sample_budget=10):
+            pass
+        self.logger.log.assert_has_calls([
+            mock.call(logging.INFO, 'Enter label', stacklevel=3,
+                      extra={'sample_rate': 1.0}),
+            mock.call(logging.INFO, 'Exit label', stacklevel=3,
+                      extra={'sample_rate': 1.0}),
+        ])
+
+    def test_skipped_calls_not_logged(self):
+        @self.context.info(sample_budget=10)
+        def function():
+            return 'output'
+
+        with mock.patch.object(AdaptiveSampler, 'sample', return_value=None):
+            assert function() == 'output'
+            with self.context.info('label', sample_budget=10):
+                pass
+        self.logger.log.assert_not_called()
+
+    def test_context_managers_share_sampler_by_label(self):
+        factory = self.context.info
+        first = factory('label', sample_budget=10)
+        second = factory('label', sample_budget=10)
+        assert first.sampler is second.sampler
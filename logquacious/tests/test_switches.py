@@ -0,0 +1,85 @@
+import logging
+
+import mock
+
+from logquacious import switches
+from logquacious.log_context import LogContext
+from logquacious.switches import FunctionRegistry
+
+
+class Entry(object):
+
+    def __init__(self, full_name, log_level=logging.DEBUG):
+        self.full_name = full_name
+        self.log_level = log_level
+        self.enabled = None
+
+
+class TestFunctionRegistry:
+
+    def setup(self):
+        self.registry = FunctionRegistry()
+        self.billing = Entry('app.billing.charge')
+        self.users = Entry('app.users.create', log_level=logging.INFO)
+        self.registry.register(self.billing)
+        self.registry.register(self.users)
+
+    def test_enabled_by_default(self):
+        assert self.billing.enabled and self.users.enabled
+
+    def test_disable_by_pattern(self):
+        assert self.registry.disable('app.billing.*') == 1
+        assert not self.billing.enabled
+        assert self.users.enabled
+
+    def test_disable_by_level(self):
+        self.registry.disable(level=logging.DEBUG)
+        assert not self.billing.enabled
+        assert self.users.enabled
+
+    def test_later_rules_take_precedence(self):
+        self.registry.disable('*')
+        self.registry.enable('app.users.*')
+        assert not self.billing.enabled
+        assert self.users.enabled
+
+    def test_rules_apply_to_later_registrations(self):
+        self.registry.disable('app.*')
+        entry = Entry('app.orders.place')
+        self.registry.register(entry)
+        assert not entry.enabled
+
+    def test_reset(self):
+        self.registry.disable('*')
+        self.registry.reset()
+        assert self.billing.enabled and self.users.enabled
+
+    def test_entries(self):
+        self.registry.disable('app.users.*')
+        assert self.registry.entries() == [
+            ('app.billing.charge', logging.DEBUG, True),
+            ('app.users.create', logging.INFO, False),
+        ]
+
+
+class TestDecoratedFunctions:
+
+    def setup(self):
+        self.logger = mock.Mock(spec=logging.Logger)
+        self.context = LogContext(self.logger)
+
+    def teardown(self):
+        switches.FUNCTIONS.reset()
+
+    def test_disabled_function_not_logged(self):
+        @self.context.debug
+        def function():
+            return 'result'
+
+        switches.disable_functions(__name__ + '.*.function')
+        assert function() == 'result'
+        self.logger.log.assert_not_called()
+
+        switches.enable_functions(__name__ + '.*')
+        function()
+        assert self.logger.log.call_count == 2
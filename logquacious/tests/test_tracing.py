@@ -0,0 +1,94 @@
+import logging
+
+from logquacious import tracing
+from logquacious.log_context import LogContext
+from logquacious.tracing import TraceLabels
+from utils import RecordingHandler
+
+
+class TestTraceLabels:
+
+    def test_from_environment(self):
+        trace = TraceLabels.from_environment({
+            'LOGQUACIOUS_TRACE': 'divide, load_batch,,',
+        })
+        assert trace.labels == {'divide', 'load_batch'}
+
+    def test_empty_environment(self):
+        assert TraceLabels.from_environment({}).labels == frozenset()
+
+    def test_set_comma_separated_string(self):
+        trace = TraceLabels()
+        trace.set('divide')
+        assert trace.labels == {'divide'}
+        trace.set('divide, load_batch')
+        assert trace.labels == {'divide', 'load_batch'}
+        trace.set('')
+        assert trace.labels == frozenset()
+
+
+class TestTracedContexts:
+
+    def setup(self):
+        self.handler = RecordingHandler()
+        self.logger = logging.getLogger('test_tracing')
+        self.logger.addHandler(self.handler)
+        self.logger.setLevel(logging.WARNING)
+        self.logger.propagate = False
+        self.context = LogContext(self.logger)
+
+    def teardown(self):
+        self.logger.removeHandler(self.handler)
+        tracing.TRACE.clear()
+
+    def messages(self):
+        return [record.getMessage() for record in self.handler.records]
+
+    def test_traced_label_logged_below_logger_level(self):
+        tracing.set_trace_labels(['traced'])
+
+        with self.context.debug('traced'):
+            pass
+        with self.context.info('other'):
+            pass
+
+        assert self.messages() == ['Enter traced', 'Exit traced']
+        assert self.handler.records[0].funcName == (
+            'test_traced_label_logged_below_logger_level'
+        )
+
+    def test_untraced_debug_labels_not_logged(self):
+        self.logger.setLevel(logging.DEBUG)
+        tracing.set_trace_labels(['traced'])
+
+        with self.context.debug('other'):
+            pass
+        with self.context.info('info label'):
+            pass
+
+        assert self.messages() == ['Enter info label', 'Exit info label']
+
+    def test_function_traced_by_full_name(self):
+        @self.context.debug
+        def function():
+            pass
+
+        tracing.set_trace_labels([function.__module__ + '.' +
+                                  function.__qualname__])
+        function()
+
+        assert len(self.handler.records) == 2
+        assert self.handler.records[0].funcName == (
+            'test_function_traced_by_full_name'
+        )
+
+    def test_disabled_logging_not_traced(self):
+        tracing.set_trace_labels(['traced'])
+        logging.disable(logging.CRITICAL)
+        try:
+            with self.context.debug('traced'):
+                pass
+        finally:
+            logging.disable(logging.NOTSET)
+
+        assert self.handler.records == []
@@ -1,3 +1,5 @@
+import logging
+
 from logquacious import utils
 
 
@@ -32,3 +34,23 @@ class TestFormatFunctionArgs:
 
     def test_show_kwargs_not_args(self):
         assert _format_func_args(['a'], {'b': 1}, show_kwargs=True) == "b=1"
+
+
+class TestIterHandlers:
+
+    def setup(self):
+        self.parent = logging.Logger('parent')
+        self.parent_handler = logging.NullHandler()
+        self.parent.addHandler(self.parent_handler)
+        self.child = logging.Logger('child')
+        self.child_handler = logging.NullHandler()
+        self.child.addHandler(self.child_handler)
+        self.child.parent = self.parent
+
+    def test_includes_parent_handlers(self):
+        assert (list(utils.iter_handlers(self.child)) ==
+                [self.child_handler, self.parent_handler])
+
+    def test_stops_without_propagation(self):
+        self.child.propagate = False
+        assert list(utils.iter_handlers(self.child)) == [self.child_handler]
@@ -0,0 +1,84 @@
+import logging
+import mock
+
+from logquacious import log_context, watchdog
+from logquacious.watchdog import ContextRegistry, ContextWatchdog
+
+
+class TestContextRegistry:
+
+    def setup(self):
+        self.registry = ContextRegistry()
+
+    def test_inactive_registry_ignores_contexts(self):
+        assert self.registry.register('label') is None
+        assert self.registry.entries() == []
+
+    def test_register_and_unregister(self):
+        self.registry.activate()
+        key = self.registry.register('label')
+        (entry_key, (label, _, _)), = self.registry.entries()
+        assert entry_key == key
+        assert label == 'label'
+
+        self.registry.unregister(key)
+        assert self.registry.entries() == []
+
+
+class TestContextWatchdog:
+
+    def setup(self):
+        self.logger = mock.Mock(spec=logging.Logger)
+        self.registry = ContextRegistry()
+        self.registry.activate()
+        self.watchdog = ContextWatchdog(timeout=10, logger=self.logger,
+                                        registry=self.registry)
+
+    def check_at(self, time):
+        with mock.patch.object(watchdog, 'perf_counter', return_value=time):
+            self.watchdog.check()
+
+    def register_at(self, time, label):
+        with mock.patch.object(watchdog, 'perf_counter', return_value=time):
+            return self.registry.register(label)
+
+    def test_new_context_not_reported(self):
+        self.register_at(0, 'label')
+        self.check_at(5)
+        self.logger.warning.assert_not_called()
+
+    def test_open_context_reported_once(self):
+        self.register_at(0, 'label')
+        self.check_at(15)
+        self.check_at(20)
+        self.logger.warning.assert_called_once_with(
+            mock.ANY, 'label', 'MainThread', 15,
+        )
+
+    def test_closed_context_not_reported(self):
+        key = self.register_at(0, 'label')
+        self.registry.unregister(key)
+        self.check_at(15)
+        self.logger.warning.assert_not_called()
+
+    def test_include_stack(self):
+        self.watchdog.include_stack = True
+        self.register_at(0, 'label')
+        self.check_at(15)
+        args = self.logger.warning.call_args[0]
+        assert 'test_include_stack' in args[-1]
+
+    def test_start_and_stop_activates_registry(self):
+        registry = ContextRegistry()
+        with ContextWatchdog(timeout=10, registry=registry):
+            assert registry.active
+        assert not registry.active
+
+
+def test_context_logger_registers_while_open():
+    context = log_context.LogContext(mock.Mock(spec=logging.Logger))
+    with ContextWatchdog(timeout=10):
+        with context.info('label'):
+            entries = watchdog.REGISTRY.entries()
+            assert [label for _, (label, _, _) in entries] == ['label']
+        assert watchdog.REGISTRY.entries() == []
@@ -1,6 +1,19 @@
+import logging
+
 from logquacious.utils import is_string
 
 
+class RecordingHandler(logging.Handler):
+
+    def __init__(self, *args, **kwargs):
+        super(RecordingHandler, self).__init__(*args, **kwargs)
+        self.records = []
+
+    def emit(self, record):
+        """Keep track of all the emitted records."""
+        self.records.append(record)
+
+
 class StartsWith(str):
 
     def __eq__(self, other):
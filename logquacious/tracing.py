@@ -0,0 +1,65 @@
+"""
+Tracing of specific context labels.
+
+If trace labels are set, `log.context.*` context managers and decorators with
+a traced label are logged even if their logger's level is higher, while
+DEBUG-level contexts with other labels aren't logged at all. Decorated
+functions can be traced by label or by full name (`module.qualname`).
+
+Trace labels are read from the comma-separated `LOGQUACIOUS_TRACE`
+environment variable at import, and can be changed with `set_trace_labels`.
+"""
+import os
+
+from .utils import is_string
+
+
+__all__ = ['TRACE', 'TraceLabels', 'set_trace_labels']
+
+
+#: Environment variable with comma-separated labels to trace.
+TRACE_ENVIRONMENT_VARIABLE = 'LOGQUACIOUS_TRACE'
+
+
+class TraceLabels(object):
+    """Set of traced labels, checked by context loggers on each entry.
+
+    Labels are given as a sequence or a comma-separated string.
+
+    Attributes:
+        labels: Frozen set of traced labels. Empty if tracing is off.
+    """
+
+    def __init__(self, labels=()):
+        self.labels = _parse_labels(labels)
+
+    def set(self, labels):
+        """Trace given labels. An empty sequence turns tracing off."""
+        self.labels = _parse_labels(labels)
+
+    def clear(self):
+        self.labels = frozenset()
+
+    @classmethod
+    def from_environment(cls, environ=os.environ):
+        return cls(environ.get(TRACE_ENVIRONMENT_VARIABLE, ''))
+
+
+def _parse_labels(labels):
+    if is_string(labels):
+        labels = (label.strip() for label in labels.split(','))
+        return frozenset(label for label in labels if label)
+    return frozenset(labels)
+
+
+#: Trace labels used by `ContextLogger` and `FunctionContextLogger`.
+TRACE = TraceLabels.from_environment()
+
+
+def set_trace_labels(labels):
+    """Trace given labels. An empty sequence turns tracing off.
+
+    Labels are given as a sequence or a comma-separated string, like
+    `LOGQUACIOUS_TRACE`.
+    """
+    TRACE.set(labels)
@@ -10,6 +10,16 @@ def get_logger(name_or_logger):
     return logging.getLogger(name_or_logger)
 
 
+def iter_handlers(logger):
+    """Yield handlers that would handle records logged to `logger`."""
+    while logger:
+        for handler in logger.handlers:
+            yield handler
+        if not logger.propagate:
+            break
+        logger = logger.parent
+
+
 def is_string(value):
     return hasattr(value, 'strip')
 
@@ -44,6 +54,116 @@ def format_function_args(args, kwargs,
     return ', '.join(chain(args, kv_pairs))
 
 
+#: Attribute set on exceptions that have already been logged by logquacious.
+LOGGED_EXCEPTION_ATTRIBUTE = '_logquacious_logged'
+
+
+def mark_exception_logged(exception):
+    """Flag exception so that outer handlers know it was already logged."""
+    try:
+        setattr(exception, LOGGED_EXCEPTION_ATTRIBUTE, True)
+    except AttributeError:  # pragma: no cover
+        # Exceptions defining `__slots__` can't be marked.
+        pass
+
+
+def is_exception_logged(exception):
+    """Return True if exception was marked by `mark_exception_logged`."""
+    return getattr(exception, LOGGED_EXCEPTION_ATTRIBUTE, False)
+
+
+class Lazy(object):
+    """Value computed by calling `func` when first converted to a string.
+
+    Use as a logging message or `%s`/`%r` argument, so that `func` is only
+    called if a handler formats the record.
+
+    >>> value = Lazy(lambda: 'computed')
+    >>> 'Value: %s' % value
+    'Value: computed'
+    """
+
+    __slots__ = ('func', '_value')
+
+    _missing = object()
+
+    def __init__(self, func):
+        self.func = func
+        self._value = self._missing
+
+    @property
+    def value(self):
+        if self._value is self._missing:
+            self._value = self.func()
+        return self._value
+
+    def __str__(self):
+        return str(self.value)
+
+    def __repr__(self):
+        return repr(self.value)
+
+
+def lazy_if_callable(value):
+    return Lazy(value) if callable(value) else value
+
+
+#: Names that can't be used for `extra` record attributes.
+RESERVED_RECORD_ATTRIBUTES = frozenset(
+    list(vars(logging.makeLogRecord({}))) + ['message', 'asctime']
+)
+
+
+def get_extra_attributes(record):
+    """Return dict of attributes added to record, e.g. with `extra`.
+
+    Standard attributes and private attributes, starting with an underscore,
+    aren't included.
+
+    >>> record = logging.makeLogRecord({'msg': 'Hello', 'request_id': 42})
+    >>> get_extra_attributes(record)
+    {'request_id': 42}
+    """
+    return {
+        name: value for name, value in vars(record).items()
+        if name not in RESERVED_RECORD_ATTRIBUTES and not name.startswith('_')
+    }
+
+
+class BraceMessage(object):
+    """Message formatted with `str.format` when converted to a string.
+
+    >>> str(BraceMessage('{} took {ms:.1f}ms', ('job',), {'ms': 12.34}))
+    'job took 12.3ms'
+    """
+
+    __slots__ = ('fmt', 'args', 'kwargs')
+
+    def __init__(self, fmt, args, kwargs):
+        self.fmt = fmt
+        self.args = args
+        self.kwargs = kwargs
+
+    def __str__(self):
+        return self.fmt.format(*self.args, **self.kwargs)
+
+    def __repr__(self):
+        return '<BraceMessage {!r}>'.format(self.fmt)
+
+    def __eq__(self, other):
+        # Compare raw values, so repeats can be detected without formatting.
+        if not isinstance(other, BraceMessage):
+            return NotImplemented
+        return (self.fmt == other.fmt and self.args == other.args
+                and self.kwargs == other.kwargs)
+
+    def __ne__(self, other):
+        equal = self.__eq__(other)
+        return equal if equal is NotImplemented else not equal
+
+    __hash__ = None
+
+
 class HandleException(ContextDecorator):
 
     handled_exceptions = ()
@@ -61,3 +181,54 @@ class HandleException(ContextDecorator):
 
     def on_exception(self):
         raise NotImplementedError()
+
+
+class SuppressEach(object):
+    """Iterable suppressing given exceptions raised by individual items.
+
+    Items are produced lazily. Items whose retrieval, or call of `func`,
+    raises one of `handled_exceptions` are skipped after calling
+    `on_exception` inside the `except` block. `on_finish` is called with this
+    instance when iteration finishes or is closed.
+
+    Attributes:
+        processed: Number of items processed, including failed items.
+        failed: Number of items that raised a handled exception.
+    """
+
+    def __init__(self, iterable, handled_exceptions, on_exception, on_finish,
+                 func=None):
+        self.handled_exceptions = handled_exceptions
+        self.on_exception = on_exception
+        self.on_finish = on_finish
+        self.processed = 0
+        self.failed = 0
+        # Consumers iterate the generator directly, so callbacks are called
+        # two levels below the consumer.
+        self._generator = self._iterate(iterable, func)
+
+    def __iter__(self):
+        return self._generator
+
+    def close(self):
+        self._generator.close()
+
+    def _iterate(self, iterable, func):
+        iterator = iter(iterable)
+        try:
+            while True:
+                try:
+                    item = next(iterator)
+                    if func is not None:
+                        item = func(item)
+                except StopIteration:
+                    break
+                except self.handled_exceptions:
+                    self.processed += 1
+                    self.failed += 1
+                    self.on_exception()
+                    continue
+                self.processed += 1
+                yield item
+        finally:
+            self.on_finish(self)
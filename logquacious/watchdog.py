@@ -0,0 +1,148 @@
+"""
+Watchdog for contexts and decorated functions that run too long.
+
+`ContextLogger` and `FunctionContextLogger` register themselves with
+`REGISTRY` while they are open, but only if a `ContextWatchdog` is running.
+The watchdog periodically checks the registry and logs a warning for any entry
+that has been open longer than its timeout.
+"""
+import itertools
+import sys
+import threading
+import traceback
+
+from . import utils
+from ._compat import perf_counter
+
+
+__all__ = ['ContextRegistry', 'ContextWatchdog', 'REGISTRY']
+
+
+class ContextRegistry(object):
+    """Registry of currently open contexts.
+
+    Registration is a no-op unless a watchdog activated the registry, so it's
+    cheap enough to leave on permanently.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._keys = itertools.count()
+        self._lock = threading.Lock()
+        self.active = 0
+
+    def register(self, label):
+        """Register open context and return key for `unregister`."""
+        if not self.active:
+            return None
+        key = next(self._keys)
+        thread = threading.current_thread()
+        self._entries[key] = (label, thread, perf_counter())
+        return key
+
+    def unregister(self, key):
+        if key is not None:
+            self._entries.pop(key, None)
+
+    def entries(self):
+        """Return list of `(key, (label, thread, start_time))` pairs."""
+        return list(self._entries.items())
+
+    def activate(self):
+        with self._lock:
+            self.active += 1
+
+    def deactivate(self):
+        with self._lock:
+            self.active = max(self.active - 1, 0)
+            if not self.active:
+                self._entries.clear()
+
+
+#: Registry used by `ContextLogger` and `FunctionContextLogger`.
+REGISTRY = ContextRegistry()
+
+
+class ContextWatchdog(object):
+    """Background monitor that warns about long-running or hung contexts.
+
+    Each open context is reported once, when it exceeds `timeout`.
+
+    >>> watchdog = ContextWatchdog(timeout=30)
+    >>> watchdog.start()
+    >>> watchdog.stop()
+
+    Arguments:
+        timeout: Number of seconds after which open contexts are reported.
+        interval: Number of seconds between checks. Defaults to a quarter of
+            `timeout`.
+        logger: Logger or logger name used for warnings.
+        include_stack: If True, include the current stack of the thread
+            running the open context.
+        registry: Registry of open contexts.
+    """
+
+    def __init__(self, timeout, interval=None, logger=__name__,
+                 include_stack=False, registry=REGISTRY):
+        self.timeout = timeout
+        self.interval = timeout / 4.0 if interval is None else interval
+        self.logger = utils.get_logger(logger)
+        self.include_stack = include_stack
+        self.registry = registry
+
+        self._reported = set()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self.registry.activate()
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run,
+                                        name='logquacious-watchdog')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._stop_event.set()
+        self._thread.join()
+        self._thread = None
+        self.registry.deactivate()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def check(self):
+        """Log warnings for contexts that have been open too long."""
+        now = perf_counter()
+        entries = self.registry.entries()
+        # Forget reported contexts that have since closed.
+        self._reported.intersection_update(key for key, _ in entries)
+
+        for key, (label, thread, start_time) in entries:
+            elapsed = now - start_time
+            if elapsed < self.timeout or key in self._reported:
+                continue
+            self._reported.add(key)
+            self._warn(label, thread, elapsed)
+
+    def _warn(self, label, thread, elapsed):
+        msg = "Context %r in thread %r has been open for %.1f seconds"
+        args = [label, thread.name, elapsed]
+        if self.include_stack:
+            frame = sys._current_frames().get(thread.ident)
+            if frame is not None:
+                msg += "\nStack (most recent call last):\n%s"
+                args.append(''.join(traceback.format_stack(frame)).rstrip())
+        self.logger.warning(msg, *args)
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            self.check()